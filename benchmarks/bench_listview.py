@@ -0,0 +1,67 @@
+"""
+Load time and memory of the word list: tk.Listbox (one insert per word, as
+LoadList used to do) against flashcore.listview.VirtualListbox.
+
+Each measurement runs in a fresh subprocess so the reported peak RSS belongs
+to that list alone. Needs a display (or Xvfb).
+
+    python benchmarks/bench_listview.py [--sizes 10000 100000 1000000]
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def child(kind, size):
+    sys.path.insert(0, ROOT)
+    import tkinter as tk
+    from flashcore.listview import VirtualListbox
+
+    words = [(f"word{i}", "") for i in range(size)]
+    root = tk.Tk()
+    root.update()
+    start = time.perf_counter()
+    if kind == "listbox":
+        listbox = tk.Listbox(root, font=("Arial", 14), height=15)
+        listbox.pack()
+        for i, (word, _) in enumerate(words):
+            listbox.insert(tk.END, f"{i + 1}. {word}")
+    else:
+        listbox = VirtualListbox(root, font=("Arial", 14), height=15)
+        listbox.pack()
+        listbox.set_items(words)
+    root.update()
+    elapsed = time.perf_counter() - start
+    root.destroy()
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":  # bytes there, kilobytes on Linux
+        peak_kb //= 1024
+    print(json.dumps({"seconds": elapsed, "peak_rss_kb": peak_kb}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args.child[0], int(args.child[1]))
+        return
+
+    print(f"{'words':>9} {'widget':<16} {'load ms':>10} {'peak RSS MB':>12}")
+    for size in args.sizes:
+        for kind in ("listbox", "virtual"):
+            out = subprocess.run([sys.executable, __file__, "--child", kind, str(size)],
+                                 capture_output=True, text=True, check=True).stdout
+            result = json.loads(out.strip().splitlines()[-1])
+            print(f"{size:>9} {kind:<16} {result['seconds'] * 1000:10.1f} {result['peak_rss_kb'] / 1024:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
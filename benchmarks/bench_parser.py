@@ -0,0 +1,109 @@
+"""
+Compare the legacy definition pipeline with flashcore.ldoce_parser.
+
+For every page in benchmarks/pages/*.html (record some with --record) the
+script checks that both pipelines produce the same card once whitespace is
+collapsed the way tkhtmlview renders it, then reports parse time and
+peak allocated memory for each. With no recorded pages, synthetic long entries for
+"set", "run" and "take" are used instead.
+
+The committed pages for "set", "run", "take" and a word with no entry
+follow ldoceonline.com's page and entry markup (nested Subsense spans,
+collocation and grammar examples, cross references, later homonym and
+business-dictionary entries, scripts naming ldoceEntry before the entry)
+with our own wording; they were written without access to the site, so
+re-record them with --record when it can be reached.
+
+    python benchmarks/bench_parser.py --record set run take
+    python benchmarks/bench_parser.py [--repeat 20]
+"""
+import argparse
+import glob
+import os
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.legacy_format import legacy_format, legacy_meaning  # noqa: E402
+from benchmarks.synthetic import synthetic_page  # noqa: E402
+from flashcore.ldoce_parser import MEANING_NOT_FOUND, extract_entry, format_entry  # noqa: E402
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+
+
+def collapse(html):
+    return re.sub(r"\s+", " ", html)
+
+
+def legacy(page):
+    return legacy_format(legacy_meaning(page))
+
+
+def single_pass(page):
+    entry = extract_entry(page)
+    return format_entry(entry) if entry is not None else legacy_format(MEANING_NOT_FOUND)
+
+
+def load_corpus():
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(PAGES_DIR, "*.html"))):
+        with open(path, encoding="utf-8") as page:
+            corpus[os.path.splitext(os.path.basename(path))[0]] = page.read()
+    if not corpus:
+        print("no recorded pages in benchmarks/pages, using synthetic entries\n")
+        corpus = {word: synthetic_page(word, senses=senses) for word, senses in (("set", 40), ("run", 45), ("take", 42))}
+    return corpus
+
+
+def record(words):
+    from flashcore.transport import default_transport
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    for word in words:
+        response = default_transport().get_word_page(word)
+        response.raise_for_status()
+        with open(os.path.join(PAGES_DIR, f"{word}.html"), "w", encoding="utf-8") as page:
+            page.write(response.text)
+        print(f"recorded {word} ({len(response.content)} bytes)")
+
+
+def measure(fn, page, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(page)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn(page)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--record", nargs="+", metavar="WORD", help="download pages into benchmarks/pages")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    if args.record:
+        record(args.record)
+        return
+
+    corpus = load_corpus()
+    mismatches = 0
+    print(f"{'word':<10} {'KB':>6} {'pipeline':<12} {'median ms':>10} {'peak KB':>9}")
+    for word, page in corpus.items():
+        if collapse(legacy(page)) != collapse(single_pass(page)):
+            mismatches += 1
+            print(f"{word}: OUTPUT DIFFERS")
+        for label, fn in (("legacy", legacy), ("single-pass", single_pass)):
+            median, peak = measure(fn, page, args.repeat)
+            print(f"{word:<10} {len(page) / 1024:6.0f} {label:<12} {median * 1000:10.2f} {peak / 1024:9.0f}")
+    print("\nall outputs match" if not mismatches else f"\n{mismatches} page(s) differ")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Measure what the pooled LdoceTransport saves over one requests.get per lookup.
+
+The local stand-in for ldoceonline.com (benchmarks/standin.py) serves a
+small dictionary page with an ETag and counts the TCP connections it
+accepts. The same number of lookups is run once with plain requests.get and
+once through LdoceTransport, then once more as conditional GETs that should
+all come back as 304.
+
+    python benchmarks/bench_transport.py [--lookups 500]
+"""
+import argparse
+import os
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.standin import StandInServer  # noqa: E402
+from flashcore.cache import CachedDefinition  # noqa: E402
+from flashcore.transport import HEADERS, LdoceTransport  # noqa: E402
+
+PAGE = ('<html><body><div class="dictionary"><span class="ldoceEntry Entry">'
+        '<span class="HWD">{word}</span><span class="Sense"><span class="DEF">a stand-in definition</span>'
+        '</span></span></div></body></html>')
+
+
+def run(label, server, lookup, lookups):
+    server.connections = 0
+    statuses = {}
+    start = time.perf_counter()
+    for i in range(lookups):
+        status = lookup(f"word{i % 50}")
+        statuses[status] = statuses.get(status, 0) + 1
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {elapsed * 1000:9.1f} ms total  {elapsed / lookups * 1e6:8.1f} us/lookup  "
+          f"{server.connections:4d} connections  statuses={statuses}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lookups", type=int, default=500)
+    args = parser.parse_args()
+
+    server = StandInServer(page_for=lambda word: PAGE.format(word=word)).start()
+    base_url = server.base_url
+    transport = LdoceTransport(base_url=base_url)
+
+    naive = run("requests.get", server,
+                lambda w: requests.get(base_url + w, headers=HEADERS, timeout=(5, 15)).status_code, args.lookups)
+    pooled = run("LdoceTransport", server, lambda w: transport.get_word_page(w).status_code, args.lookups)
+
+    validators = {}
+    for i in range(50):
+        response = transport.get_word_page(f"word{i}")
+        validators[f"word{i}"] = CachedDefinition("", "", response.headers.get("ETag"), None)
+    run("LdoceTransport (304)", server,
+        lambda w: transport.get_word_page(w, validators[w]).status_code, args.lookups)
+
+    print(f"pooled session is {naive / pooled:.2f}x faster than a new connection per lookup")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
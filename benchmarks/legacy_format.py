@@ -0,0 +1,68 @@
+"""
+The definition pipeline as it was before flashcore.ldoce_parser: a full page
+parse, prettify() of the entry, then a second parse with find/find_all per
+field. Kept only as the reference the new parser is checked against.
+"""
+from bs4 import BeautifulSoup
+
+
+def extract_element(soup, name, class_):
+    try:
+        return soup.find(name, class_=class_).get_text(strip=True)
+    except Exception:
+        return None
+
+
+def legacy_meaning(page):
+    soup = BeautifulSoup(page, 'html.parser')
+    entry = soup.find(class_='ldoceEntry')
+    return entry.prettify() if entry else "Meaning not found."
+
+
+def legacy_format(html_content):
+    soup = BeautifulSoup(html_content, 'html.parser')
+    try:
+        related_topics = soup.find('span', class_='topics_container')
+        related_text = extract_element(related_topics, 'span', class_='related_topics')
+        topic_text = extract_element(related_topics, 'a', class_='topic')
+        hwd = extract_element(soup, 'span', class_='HWD')
+        hyphenation = extract_element(soup, 'span', class_='HYPHENATION')
+        pron = extract_element(soup, 'span', class_='PRON')
+        pos = extract_element(soup, 'span', class_='POS')
+        gram = extract_element(soup, 'span', class_='GRAM')
+        output_html = f'<p>{related_text}: {topic_text}<br />' \
+                      f'<span style="color: #ff0000;"><strong>{hwd}</strong></span> {hyphenation} ' \
+                      f'<span style="color: #ff6600;">/ {pron} /</span> ' \
+                      f'<span style="color: #339966;"><strong> {pos}</strong></span> {gram}</p>'
+        for sense in soup.find_all('span', class_='Sense'):
+            sensenum = extract_element(sense, 'span', class_='sensenum')
+            registerlab = sense.find('span', class_='REGISTERLAB')
+            registerlab = registerlab.get_text(strip=True) if registerlab else ''
+            activ = sense.find('span', class_='ACTIV')
+            activ = activ.get_text(strip=True) if activ else ''
+            definition_span = sense.find('span', class_='DEF')
+            definition = definition_span.get_text(strip=False) if definition_span else ''
+            relatedwd = sense.find('span', class_='RELATEDWD')
+            relatedwd = relatedwd.get_text(strip=True) if relatedwd else ''
+            example = sense.find('span', class_='EXAMPLE')
+            example = example.get_text(strip=False) if example else ''
+            additional_examples = []
+            for exa in sense.find_all('span', class_='GramExa'):
+                additional_example = exa.find('span', class_='EXAMPLE')
+                if additional_example:
+                    additional_examples.append(additional_example.get_text(strip=True))
+            sense_content = f'<p>{sensenum}. '
+            if registerlab:
+                sense_content += f'<span style="color: #333399;"><em>{registerlab}</em></span> '
+            if activ:
+                sense_content += f'<span style="color: #333399;"><em>{activ}</em></span> '
+            sense_content += f'{definition} {relatedwd}<br />'
+            if example:
+                sense_content += f'<span style="color: #808080;"><em>&nbsp;&nbsp;{example}</em></span><br />'
+            for ex in additional_examples:
+                sense_content += f'<span style="color: #808080;"><em>&nbsp;&nbsp;{ex}</em></span><br />'
+            sense_content += '</p>'
+            output_html += sense_content
+    except Exception as e:
+        output_html = f"{e}"
+    return output_html
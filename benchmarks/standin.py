@@ -0,0 +1,146 @@
+"""
+A local stand-in for ldoceonline.com.
+
+Serves benchmarks/pages/<word>.html when it has been recorded (see
+bench_parser.py --record) and a synthetic entry otherwise, with ETags for
+conditional GETs. Latency and failures can be injected, and all randomness
+is seeded, so two runs with the same settings see the same server.
+
+    python benchmarks/standin.py --port 8765 --latency 80 --jitter 40 --error-rate 0.05
+
+then point "ldoce_url" in configs.json at http://127.0.0.1:8765/dictionary/.
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.synthetic import synthetic_page  # noqa: E402
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pages")
+NOT_FOUND_PAGE = '<html><body><div class="dictionary"><p>Sorry, no results for {word}</p></div></body></html>'
+
+
+def recorded_or_synthetic(word):
+    path = os.path.join(PAGES_DIR, f"{word}.html")
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as page:
+            return page.read()
+    return synthetic_page(word)
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_GET(self):
+        server = self.server
+        word = unquote(self.path.rsplit("/", 1)[-1])
+        with server.lock:
+            server.requests += 1
+            delay = max(0.0, server.latency + server.rng.uniform(-server.jitter, server.jitter))
+            roll = server.rng.random()
+        if delay:
+            time.sleep(delay)
+        if roll < server.drop_rate:
+            # the connection dies without a response
+            self.close_connection = True
+            self.connection.shutdown(2)
+            return
+        if roll < server.drop_rate + server.error_rate:
+            self._send(server.error_status, b"injected failure", None)
+            return
+        if word in server.missing:
+            self._send(200, NOT_FOUND_PAGE.format(word=word).encode("utf-8"), None)
+            return
+        body = server.page_for(word).encode("utf-8")
+        etag = '"%s"' % hashlib.md5(body).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", etag)
+            return
+        self._send(200, body, etag)
+
+    def _send(self, status, body, etag):
+        self.send_response(status)
+        if status == 200:
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandInServer(ThreadingHTTPServer):
+    """
+    latency and jitter are in seconds. error_rate is the share of requests
+    answered with error_status, drop_rate the share whose connection is
+    closed without an answer, and words in missing get a page without an
+    entry.
+    """
+    daemon_threads = True
+
+    def __init__(self, port=0, page_for=recorded_or_synthetic, latency=0.0, jitter=0.0, error_rate=0.0,
+                 error_status=503, drop_rate=0.0, missing=(), seed=0):
+        super().__init__(("127.0.0.1", port), StandInHandler)
+        self.page_for = page_for
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.drop_rate = drop_rate
+        self.missing = set(missing)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+
+    @property
+    def base_url(self):
+        return "http://127.0.0.1:%d/dictionary/" % self.server_address[1]
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0, help="milliseconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0, help="+/- milliseconds of random latency")
+    parser.add_argument("--error-rate", type=float, default=0, help="share of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--drop-rate", type=float, default=0, help="share of connections closed without a response")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    server = StandInServer(args.port, latency=args.latency / 1000, jitter=args.jitter / 1000,
+                           error_rate=args.error_rate, error_status=args.error_status,
+                           drop_rate=args.drop_rate, seed=args.seed)
+    print(f"serving {server.base_url}  (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
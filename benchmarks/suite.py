@@ -0,0 +1,348 @@
+"""
+Benchmark suite, to tell whether a change makes the app slower.
+
+    python benchmarks/suite.py                    # run and compare with benchmarks/baseline.json
+    python benchmarks/suite.py --quick            # smaller decks, fewer lookups
+    python benchmarks/suite.py --output run.json  # also write the results as JSON
+    python benchmarks/suite.py --save-baseline    # make this run the new baseline
+
+What is measured:
+
+  lookup  end-to-end get_word_def (FlashcardEngine.define) against the local
+          stand-in server (benchmarks/standin.py) with injected latency and
+          errors: p50/p95/p99, cold (network) and warm (cache), and the
+          same words answered by a local StarDict dictionary
+  format  ldoce_parser.format_html throughput over raw entries
+  deck    readWordSrcFile (blocking, and background: first rows and total),
+          the idle-time search index build and LoadList on synthetic decks
+          of 1k to 1M words, and opening the same deck as a binary deck
+  render  writeFlashCard time per card: until the first part is on screen
+          (CardView renders the rest in idle callbacks), the whole card,
+          and showing an already rendered card again
+
+LoadList and writeFlashCard need a display and are skipped without one.
+A metric regresses when it is worse than the baseline by more than
+--tolerance and, for timings, by more than --floor-ms, so noise on
+sub-millisecond numbers does not count. Exits with 1 on a regression.
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.standin import StandInServer, recorded_or_synthetic  # noqa: E402
+from benchmarks.synthetic import write_synthetic_deck, write_synthetic_stardict  # noqa: E402
+from flashcore.deck import Deck  # noqa: E402
+from flashcore.deckfile import text_to_binary  # noqa: E402
+from flashcore.engine import FlashcardEngine  # noqa: E402
+from flashcore.ldoce_parser import extract_entry, format_html  # noqa: E402
+from flashcore.lookup import OFFLINE_MESSAGE  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+DECK_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+QUICK_DECK_SIZES = (1_000, 10_000, 100_000)
+FIRST_ROWS = 50  # about a screenful of the word list
+DECK_RUNS = 3
+LARGE_DECK = 1_000_000
+STARDICT_WORDS = 100_000
+
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), round(p / 100 * len(sorted_values) + 0.5)))
+    return sorted_values[rank - 1]
+
+
+def latency_metrics(prefix, seconds):
+    ms = sorted(s * 1000 for s in seconds)
+    return {f"{prefix}.p50_ms": percentile(ms, 50),
+            f"{prefix}.p95_ms": percentile(ms, 95),
+            f"{prefix}.p99_ms": percentile(ms, 99)}
+
+
+def size_label(size):
+    return f"{size // 1_000_000}M" if size >= 1_000_000 else f"{size // 1_000}k"
+
+
+def open_tk():
+    """A Tk root for the widget benchmarks, or None without a display."""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as e:
+        print(f"no display ({e}); LoadList and writeFlashCard are skipped\n")
+        return None
+    root.geometry("900x600")
+    root.update()
+    return root
+
+
+def bench_lookup(args, workdir, metrics, info):
+    server = StandInServer(latency=args.latency / 1000, jitter=args.jitter / 1000,
+                           error_rate=args.error_rate, seed=args.seed).start()
+    engine = FlashcardEngine({"ldoce_url": server.base_url, "http_retries": 2,
+                              "def_cache_path": os.path.join(workdir, "definitions.db")}, workdir)
+    words = [f"word{i}" for i in range(args.lookups)]
+    try:
+        for label in ("cold", "warm"):
+            seconds, failures = [], 0
+            for word in words:
+                start = time.perf_counter()
+                try:
+                    card = engine.define(word)
+                    # failed lookups come back as fallback cards that say why
+                    failures += "Failed to retrieve" in card or OFFLINE_MESSAGE in card
+                except Exception:
+                    failures += 1
+                seconds.append(time.perf_counter() - start)
+            metrics.update(latency_metrics(f"lookup.{label}", seconds))
+            info[f"lookup.{label}.failures"] = failures
+        info["lookup.server_requests"] = server.requests
+    finally:
+        engine.close()
+        server.stop()
+
+    base = os.path.join(workdir, "synthetic")
+    words = random.Random(args.seed).sample(write_synthetic_stardict(base, STARDICT_WORDS, args.seed), args.lookups)
+    engine = FlashcardEngine({"dictionaries": [{"type": "stardict", "path": base + ".ifo"}],
+                              "def_cache_path": os.path.join(workdir, "local.db")}, workdir)
+    try:
+        seconds = []
+        for word in words:
+            start = time.perf_counter()
+            engine.define(word)
+            seconds.append(time.perf_counter() - start)
+        metrics.update(latency_metrics("lookup.stardict", seconds))
+    finally:
+        engine.close()
+
+
+def bench_format(args, metrics, info):
+    raw = [str(extract_entry(recorded_or_synthetic(f"word{i}"))) for i in range(args.format_cards)]
+    size = sum(len(html) for html in raw)
+    cards = []
+    start = time.perf_counter()
+    for _ in range(args.format_repeat):
+        cards = [format_html(html) for html in raw]
+    elapsed = time.perf_counter() - start
+    metrics["format.cards_per_s"] = len(raw) * args.format_repeat / elapsed
+    metrics["format.mb_per_s"] = size * args.format_repeat / elapsed / 1e6
+    info["format.mean_entry_kb"] = round(size / len(raw) / 1024, 1)
+    return cards
+
+
+def bench_deck(args, workdir, root, metrics):
+    listbox = None
+    if root is not None:
+        from flashcore.listview import VirtualListbox, numbered_row
+        listbox = VirtualListbox(root, font=("Arial", 14), height=15)
+        listbox.pack()
+    for size in args.deck_sizes:
+        label = f"deck.{size_label(size)}"
+        path = os.path.join(workdir, f"words-{size}.txt")
+        write_synthetic_deck(path, size, seed=args.seed)
+        binary_path = os.path.join(workdir, f"words-{size}.fdeck")
+        text_to_binary(path, binary_path)
+        engine = FlashcardEngine({"def_cache_path": os.path.join(workdir, "deck.db")}, workdir)
+        best = {}
+
+        def keep_best(name, start):
+            elapsed = (time.perf_counter() - start) * 1000
+            best[name] = min(best.get(name, elapsed), elapsed)
+
+        try:
+            # small decks are timed a few times, best run kept, so one hiccup is not a regression
+            for _ in range(DECK_RUNS if size < LARGE_DECK else 1):
+                gc.collect()
+                start = time.perf_counter()
+                engine.load_deck(path)
+                keep_best("read_ms", start)
+
+                start = time.perf_counter()
+                while not engine.index.build_step():
+                    pass
+                keep_best("index_build_ms", start)
+
+                # freeing the first deck and its index is not part of loading the second
+                engine.set_deck(Deck())
+                gc.collect()
+                start = time.perf_counter()
+                loader = engine.start_loading(path)
+                while len(engine.words) < min(FIRST_ROWS, size) and not loader.done:
+                    time.sleep(0.0005)
+                keep_best("first_rows_ms", start)
+                engine.finish_loading()
+                keep_best("background_read_ms", start)
+
+                if listbox is not None:
+                    start = time.perf_counter()
+                    listbox.set_items(engine.words, format_row=numbered_row)
+                    root.update_idletasks()
+                    keep_best("loadlist_ms", start)
+                    listbox.set_items([])
+                engine.set_deck(Deck())
+
+                gc.collect()
+                start = time.perf_counter()
+                engine.load_deck(binary_path)
+                rows = [engine.words[i] for i in range(min(FIRST_ROWS, size))]
+                keep_best("binary_first_rows_ms", start)
+                start = time.perf_counter()
+                engine.search(rows[-1][0][:4])
+                keep_best("binary_search_ms", start)
+                engine.set_deck(Deck())
+        finally:
+            engine.close()
+            os.remove(path)
+            os.remove(binary_path)
+        metrics.update((f"{label}.{name}", value) for name, value in best.items())
+    if listbox is not None:
+        listbox.destroy()
+
+
+def bench_render(cards, root, metrics):
+    from flashcore.cardview import CardView
+    card_view = CardView(root, cached_cards=len(cards))
+    card_view.pack(fill="both", expand=True)
+    root.update()
+    first, full, again = [], [], []
+    for card in cards:
+        start = time.perf_counter()
+        card_view.show(card)
+        root.update_idletasks()
+        first.append(time.perf_counter() - start)
+        root.update()  # runs the idle callbacks that append the remaining senses
+        full.append(time.perf_counter() - start)
+    for card in cards:
+        start = time.perf_counter()
+        card_view.show(card)
+        root.update_idletasks()
+        again.append(time.perf_counter() - start)
+    metrics.update(latency_metrics("render.first", first))
+    metrics.update(latency_metrics("render.full", full))
+    metrics.update(latency_metrics("render.cached", again))
+    card_view.destroy()
+
+
+def compare(metrics, baseline, tolerance, floor_ms):
+    """Print metrics against the baseline; returns the names that regressed."""
+    regressions = []
+    print(f"{'metric':<34} {'value':>12} {'baseline':>12} {'change':>8}")
+    for name in sorted(metrics):
+        value = metrics[name]
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<34} {value:12.2f} {'-':>12} {'new':>8}")
+            continue
+        change = (value - base) / base if base else 0.0
+        higher_is_better = name.endswith("_per_s")
+        worse = -change if higher_is_better else change
+        regressed = worse > tolerance and (higher_is_better or value - base > floor_ms)
+        flag = "  REGRESSION" if regressed else ""
+        print(f"{name:<34} {value:12.2f} {base:12.2f} {change * 100:+7.1f}%{flag}")
+        if regressed:
+            regressions.append(name)
+    for name in sorted(set(baseline) - set(metrics)):
+        print(f"{name:<34} {'skipped':>12} {baseline[name]:12.2f}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=("lookup", "format", "deck", "render"))
+    parser.add_argument("--quick", action="store_true", help="decks up to 100k words and 100 lookups")
+    parser.add_argument("--lookups", type=int, default=None, help="words looked up (default 300, 100 with --quick)")
+    parser.add_argument("--latency", type=float, default=20, help="stand-in server latency in ms")
+    parser.add_argument("--jitter", type=float, default=10, help="+/- ms of random latency")
+    parser.add_argument("--error-rate", type=float, default=0.02, help="share of requests answered with 503")
+    parser.add_argument("--format-cards", type=int, default=30)
+    parser.add_argument("--format-repeat", type=int, default=5)
+    parser.add_argument("--deck-sizes", type=int, nargs="+", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true", help="write the results to --baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown (0.25 = 25%%)")
+    parser.add_argument("--floor-ms", type=float, default=2.0, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+    if args.lookups is None:
+        args.lookups = 100 if args.quick else 300
+    if args.deck_sizes is None:
+        args.deck_sizes = QUICK_DECK_SIZES if args.quick else DECK_SIZES
+    selected = set(args.only or ("lookup", "format", "deck", "render"))
+    random.seed(args.seed)  # retry backoff jitter
+
+    settings = {name: getattr(args, name) for name in
+                ("lookups", "latency", "jitter", "error_rate", "format_cards", "format_repeat", "seed")}
+    settings["deck_sizes"] = list(args.deck_sizes)
+    metrics, info = {}, {}
+    workdir = tempfile.mkdtemp(prefix="flashcard-bench-")
+    root = open_tk() if selected & {"deck", "render"} else None
+    try:
+        if "lookup" in selected:
+            print("lookup ...")
+            bench_lookup(args, workdir, metrics, info)
+        cards = []
+        if selected & {"format", "render"}:
+            print("format ...")
+            cards = bench_format(args, metrics, info)
+        if "deck" in selected:
+            print("deck ...")
+            bench_deck(args, workdir, root, metrics)
+        if "render" in selected and root is not None:
+            print("render ...")
+            bench_render(cards, root, metrics)
+    finally:
+        if root is not None:
+            root.destroy()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    results = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "settings": settings,
+        },
+        "metrics": {name: round(value, 3) for name, value in metrics.items()},
+        "info": info,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+    print()
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline["meta"].get("settings") != settings:
+            print("note: the baseline was recorded with different settings\n")
+        regressions = compare(results["metrics"], baseline["metrics"], args.tolerance, args.floor_ms)
+    else:
+        compare(results["metrics"], {}, args.tolerance, args.floor_ms)
+    for name, value in sorted(info.items()):
+        print(f"{name:<34} {value:>12}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f"\nbaseline written to {args.baseline}")
+    elif regressions:
+        print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
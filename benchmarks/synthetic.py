@@ -0,0 +1,80 @@
+"""Synthetic pages shaped like ldoceonline.com entries, and synthetic word lists."""
+import random
+
+_WORDS = ("time person year way day thing man world life hand part child eye woman place work week case "
+          "point government company number group problem fact").split()
+
+
+def _sentence(rng, n):
+    return " ".join(rng.choice(_WORDS) for _ in range(n)).capitalize() + "."
+
+
+def synthetic_page(word, senses=12, seed=None):
+    """Return a full HTML page with one ldoceEntry for word and the given number of senses."""
+    rng = random.Random(seed if seed is not None else word)
+    head = "".join(f'<script>var x{i} = "{_sentence(rng, 12)}";</script>' for i in range(40))
+    nav = "".join(f'<li><a href="/browse/{w}">{w}</a></li>' for w in rng.sample(_WORDS, 15))
+    sense_html = []
+    for i in range(1, senses + 1):
+        gram_exas = "".join(
+            f'<span class="GramExa"><span class="PROPFORM">{rng.choice(_WORDS)} something</span>'
+            f'<span class="EXAMPLE"><span class="speaker">&#x1f50a;</span> {_sentence(rng, 8)}</span></span>'
+            for _ in range(rng.randint(0, 3)))
+        register = '<span class="REGISTERLAB">formal</span> ' if i % 4 == 0 else ''
+        activ = f'<span class="ACTIV">{rng.choice(_WORDS).upper()}</span>' if i % 3 == 0 else ''
+        sense_html.append(
+            f'<span class="Sense" id="{word}__{i}"><span class="sensenum span">{i}</span> {register}{activ}'
+            f'<span class="GRAM"><span class="neutral span">[</span>transitive<span class="neutral span">]</span></span> '
+            f'<span class="DEF">to {_sentence(rng, 10).lower()} <a class="defRef" href="/dictionary/{rng.choice(_WORDS)}">'
+            f'{rng.choice(_WORDS)}</a> {_sentence(rng, 5).lower()}</span> '
+            f'<span class="RELATEDWD">{word}ing</span>'
+            f'<span class="EXAMPLE"><span class="speaker">&#x1f50a;</span> {_sentence(rng, 9)}</span>'
+            f'{gram_exas}</span>')
+    entry = (
+        f'<span class="ldoceEntry Entry"><span class="topics_container">'
+        f'<span class="related_topics">Related topics:</span> <a class="topic" href="/topics/x">Everyday life</a></span>'
+        f'<span class="frequent Head"><span class="HWD">{word}</span>'
+        f'<span class="HYPHENATION">{"‧".join(word)}</span> <span class="PronCodes">'
+        f'<span class="PRON">{word}</span></span> <span class="POS"> verb</span>'
+        f'<span class="GRAM"><span class="neutral span">[</span>I, T<span class="neutral span">]</span></span></span>'
+        + "".join(sense_html) + '</span>')
+    second = entry.replace(' verb</span>', ' noun</span>')
+    foot = "".join(f'<div class="footer-link"><a href="/f{i}">{_sentence(rng, 3)}</a></div>' for i in range(30))
+    return (f'<!DOCTYPE html><html><head><title>{word}</title>{head}</head><body><ul class="nav">{nav}</ul>'
+            f'<div class="dictionary"><h1 class="pagetitle">{word}</h1>{entry}{second}</div>{foot}</body></html>')
+
+
+def write_synthetic_deck(path, size, seed=0):
+    """Write a word source file of size lines; two in three have a short meaning."""
+    rng = random.Random(seed)
+    with open(path, "w") as deck:
+        for i in range(size):
+            word = f"{rng.choice(_WORDS)}{i}"
+            if i % 3:
+                deck.write(f"{word} - {' '.join(rng.choice(_WORDS) for _ in range(rng.randint(1, 6)))}\n")
+            else:
+                deck.write(word + "\n")
+
+
+def write_synthetic_stardict(base, size, seed=0):
+    """Write base.ifo/.idx/.dict, a plain-text StarDict dictionary of size words; returns the words."""
+    rng = random.Random(seed)
+    entries = []
+    for i in range(size):
+        word = f"{rng.choice(_WORDS)}{i}"
+        senses = "\n".join(f"{n}. {_sentence(rng, 8)}" for n in range(1, rng.randint(2, 5)))
+        entries.append((word.encode("utf-8"), f"noun\n{senses}".encode("utf-8")))
+    entries.sort(key=lambda entry: (entry[0].lower(), entry[0]))
+    idx = bytearray()
+    offset = 0
+    with open(base + ".dict", "wb") as dict_file:
+        for word, article in entries:
+            dict_file.write(article)
+            idx += word + b"\0" + offset.to_bytes(4, "big") + len(article).to_bytes(4, "big")
+            offset += len(article)
+    with open(base + ".idx", "wb") as idx_file:
+        idx_file.write(idx)
+    with open(base + ".ifo", "w") as ifo:
+        ifo.write(f"StarDict's dict ifo file\nversion=2.4.2\nbookname=Synthetic\nwordcount={size}\n"
+                  f"idxfilesize={len(idx)}\nsametypesequence=m\n")
+    return [word.decode("utf-8") for word, _ in entries]
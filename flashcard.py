@@ -1,102 +1,140 @@
+import time
+_startTime = time.perf_counter()
 import tkinter as tk
-from tkinter import messagebox,filedialog
-from bs4 import BeautifulSoup
-import requests
-from tkhtmlview import HTMLScrolledText
+from tkinter import messagebox,filedialog,simpledialog
 import os
 import sys
 import json
-import random
-
-def extract_element(soup,name:str,class_:str):
-    data=None
-    try:
-        data = soup.find(name, class_=class_).get_text(strip=True)
-    except:
-        data = None
-    return data
-
-def get_word_definition(word):
-    """Fetch and extract word definition from the LDOCE dictionary page."""
-    url = f"https://www.ldoceonline.com/dictionary/{word}"
-    
-    try:
-        # Send a GET request to the URL
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'}
-        response = requests.get(url, headers=headers)
-        
-        # Check if the request was successful
-        if response.status_code == 200:
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Find the div with class "dictionary" (where definitions are typically found)
-            dictionary_div = soup.find('div', {'class': 'dictionary'})
-            
-            if dictionary_div:
-                # Return the HTML content of the dictionary div
-                return str(dictionary_div)
-            else:
-                return "Definition not found."
-        else:
-            return f"Failed to retrieve the page. Status code: {response.status_code}"
-    except Exception as e:
-        return f"Failed to retrieve the page. Error: {e}"
+import threading
+import multiprocessing
+from flashcore import instrument
+from flashcore.config import config_file_path, load_config
+from flashcore.engine import FlashcardEngine
+from flashcore.fetcher import DefinitionFetcher
+from flashcore.listview import VirtualListbox, numbered_row
+from flashcore.scheduler import GRADES
+from flashcore.startup import StartupTrace, STARTUP_BUDGET_MS
+_importsDone = time.perf_counter()
+
+FETCH_POLL_MS = 30
+INDEX_BUILD_MS = 1
+DECK_POLL_MS = 15
+JOB_POLL_MS = 500
+
+def preloadModules():
+    """Import the heavy modules on a background thread while the window comes up."""
+    def run():
+        # written out so PyInstaller still sees these imports
+        import tkhtmlview
+        import bs4
+        import requests
+    threading.Thread(target=run, name="preload", daemon=True).start()
 
 class FlashcardApp:
-    def __init__(self):
+    """Tk view over a FlashcardEngine, which owns the deck, lookups and navigation."""
+
+    def __init__(self, trace=None):
 
         # List of words and their meanings
         self.words = []
-        self.current_index = 0
-        self.is_flipped = False
-        self.definition_html = ""  # To store HTML content for the definition
-        self.current_word = ''
-        self.lines = []
+        self.listPositions = None  # deck positions shown while a search is active
+        self.searchJob = None
+        self.indexJob = None
+        self.deckJob = None
+        self.deckLoader = None
+        self.loadedRows = 0
+        self.pendingCard = None  # card written before the card view exists
+        self.deckBusy = False  # an export is reading the deck, so it must not be edited
         self.listBoxPos=[0,0]
+        self.trace = trace or StartupTrace()
 
-        if getattr(sys, 'frozen', False):  # Running as a bundled app
-            # If running as an exe, use sys._MEIPASS to get the correct path
-            base_path = sys._MEIPASS            
-        else:  # Running as a script
-            base_path = os.path.dirname(os.path.abspath(__file__))
-        
-        self.configFilePath = os.path.join(base_path, 'configs.json')
+        start = time.perf_counter()
+        self.configFilePath = config_file_path()
         self.configJson = self.loadConfigFile()
+        self.trace.budget_ms = self.configJson.get("startup_budget_ms", STARTUP_BUDGET_MS)
+        self.trace.phase("config load", start)
+
+        #deck, search index, cached lookups and navigation state
+        start = time.perf_counter()
+        self.engine = FlashcardEngine(self.configJson, os.path.dirname(self.configFilePath))
+        self.session = self.engine.session
+        self.defCache = self.engine.cache
                 
+        #background definition lookups, results are handed back on the Tk thread
+        self.fetcher = DefinitionFetcher(self.get_word_def,
+                                         prefetch_workers=self.configJson.get("prefetch_workers", 2))
+        self.trace.phase("engine", start)
+
         #create GUI
+        start = time.perf_counter()
         self.initGUI()
+        self.trace.phase("initGUI", start)
+        self.root.after(FETCH_POLL_MS, self.pollFetcher)
 
         if(self.verifySourceFile(self.configJson["word_src_path"])):
             self.wordSrcTkVar.set((self.configJson["word_src_path"]))
 
-        #read word src file
+        #read word src file, on a worker thread; the list fills in as it is read
         self.readWordSrcFile(self.configJson["word_src_path"])
 
         #load words into UI
+        start = time.perf_counter()
         self.LoadList()
+        self.trace.phase("LoadList", start)
 
+        self.root.after_idle(self.onFirstIdle)
         print("done init")
+
+    def onFirstIdle(self):
+        # the window has been drawn and now responds to input
+        self.root.update_idletasks()
+        self.trace.mark("interactive")
+        self.root.after_idle(self.createCardView)
+        # read the review history before the first grade needs it
+        threading.Thread(target=lambda: self.engine.scheduler, name="scheduler", daemon=True).start()
+
+    def onClose(self):
+        # queued lookups are cancelled; otherwise interpreter exit would run every one of them first
+        self.fetcher.shutdown()
+        # saves the schedule snapshot and writes the trace_export_path trace
+        self.engine.close()
+        self.root.destroy()
+
+    def reportStartup(self):
+        # once the window is complete and the whole deck is in
+        if self.card_text is not None and self.deckLoader is None:
+            self.trace.report(words=len(self.words))
         
     def initGUI(self):
         self.root = tk.Tk()
         self.root.title("Flashcard App")
         self.root.geometry("900x600")  # Initial size, will scale with window resizing
+        self.root.protocol("WM_DELETE_WINDOW", self.onClose)
         self.wordSrcTkVar=tk.StringVar(value="browse a word source")
         self.newWord=tk.StringVar(value="")
+        self.searchVar=tk.StringVar(value="")
 
         # Configure grid layout to only expand the "Word and Meaning" area
         self.root.grid_rowconfigure(0, weight=2)  # More space for word display
         self.root.grid_rowconfigure(1, weight=0)  # Buttons
         self.root.grid_rowconfigure(2, weight=0)  # src file
+        self.root.grid_rowconfigure(3, weight=0)  # status bar
 
         # Column configurations:
         self.root.grid_columnconfigure(0, weight=0)  # Listbox column (no expansion)
         self.root.grid_columnconfigure(1, weight=0)  # Scrollbar column (no expansion)
         self.root.grid_columnconfigure(2, weight=2)  # Word and Meaning area (expands)
 
-        # Word List Section (0,0) and (1,0)
-        self.word_listbox = tk.Listbox(self.root, font=("Arial", 14), height=15)
-        self.word_listbox.grid(row=0, column=0, rowspan=2, padx=5, pady=10, sticky="nsew")
+        # Word List Section (0,0) and (1,0), with the search box on top
+        listFrame = tk.Frame(self.root)
+        listFrame.grid(row=0, column=0, rowspan=2, padx=5, pady=10, sticky="nsew")
+
+        self.searchEntry = tk.Entry(listFrame,textvariable=self.searchVar,justify='left')
+        self.searchEntry.pack(side=tk.TOP,fill=tk.X,pady=(0,5))
+        self.searchVar.trace_add("write", self.onSearchChanged)
+
+        self.word_listbox = VirtualListbox(listFrame, font=("Arial", 14), height=15)
+        self.word_listbox.pack(side=tk.TOP,fill=tk.BOTH,expand=True)
 
         # Create a Scrollbar for the Listbox
         self.scrollbar = tk.Scrollbar(self.root, orient=tk.VERTICAL, command=self.word_listbox.yview, width=15)
@@ -120,9 +158,8 @@ class FlashcardApp:
         self.addWordButton = tk.Button(addWordFrame,text="Add",command=self.OnAddWord)
         self.addWordButton.pack(padx=2)
 
-        # Word and Meaning Display (0,2)
-        self.card_text = HTMLScrolledText(self.root, html="")
-        self.card_text.grid(row=0, column=2, padx=10, pady=10, sticky="nsew")
+        # Word and Meaning Display (0,2), created by createCardView once the window is up
+        self.card_text = None
 
         # Frame for words text browser entry
         wordSrcFrame = tk.Frame(self.root)
@@ -130,6 +167,12 @@ class FlashcardApp:
         
         self.browseButton = tk.Button(wordSrcFrame,text="Browse",command=self.browse_src_file)
         self.browseButton.pack(side='left',padx=2,anchor=tk.CENTER) 
+
+        self.exportButton = tk.Button(wordSrcFrame,text="Export",command=self.onClickExport)
+        self.exportButton.pack(side='left',padx=2,anchor=tk.CENTER)
+
+        self.importButton = tk.Button(wordSrcFrame,text="Import",command=self.onClickImport)
+        self.importButton.pack(side='left',padx=2,anchor=tk.CENTER)
         
         self.srcLabel = tk.Label(wordSrcFrame,textvariable=self.wordSrcTkVar,justify='left',
                                  state='disabled', borderwidth=2, relief=tk.FLAT)
@@ -152,123 +195,55 @@ class FlashcardApp:
         self.flip_button = tk.Button(buttonFrame, text="Flip", command=self.flip_card)
         self.flip_button.pack(side='left',padx=5)
 
+        # grading a card moves on to the next one the scheduler picks
+        for label, grade in GRADES.items():
+            gradeButton = tk.Button(buttonFrame, text=label, command=lambda grade=grade: self.onGrade(grade))
+            gradeButton.pack(side='left',padx=2)
+
         self.next_button = tk.Button(buttonFrame, text="Next", command=self.show_next_word)
         self.next_button.pack(side='left',padx=5)
 
+        # optional status bar with the timing breakdown of the last card
+        self.statusVar=tk.StringVar(value="")
+        if self.configJson.get("status_bar", False):
+            self.statusBar = tk.Label(self.root,textvariable=self.statusVar,anchor='w',
+                                      relief=tk.SUNKEN,borderwidth=1,font=("Arial", 10))
+            self.statusBar.grid(row=3,column=0,columnspan=3,sticky='ew')
+
         # Bind the Listbox selection event to update the flashcard
         self.word_listbox.bind('<<ListboxSelect>>', self.on_word_select)
         
-    def convert_html_to_custom_format(self,html_content):
-        # Parse the HTML content using BeautifulSoup
-        soup = BeautifulSoup(html_content, 'html.parser')
-        try:
-            # Extract the related topics and format them
-            related_topics = soup.find('span', class_='topics_container')
-            related_text = extract_element(related_topics,'span', class_='related_topics')
-            topic_text = extract_element(related_topics,'a', class_='topic')
-
-            # Extract headword (HWD), hyphenation, pronunciation (PRON), part of speech (POS), and grammar (GRAM)
-            hwd = extract_element(soup,'span', class_='HWD')
-            hyphenation = extract_element(soup,'span', class_='HYPHENATION')
-            pron = extract_element(soup,'span', class_='PRON')
-            pos = extract_element(soup,'span', class_='POS')
-            gram = extract_element(soup,'span', class_='GRAM')
-
-            # Format the first paragraph
-            paragraph = f'<p>{related_text}: {topic_text}<br />' \
-                        f'<span style="color: #ff0000;"><strong>{hwd}</strong></span> {hyphenation} ' \
-                        f'<span style="color: #ff6600;">/ {pron} /</span> ' \
-                        f'<span style="color: #339966;"><strong> {pos}</strong></span> {gram}</p>'
-
-            # Initialize the output string
-            output_html = paragraph
-
-            # Extract the senses and format them
-            for sense in soup.find_all('span', class_='Sense'):
-                # Extract the sense number, register label, activity, definition, related word, and examples
-                sensenum = extract_element(sense,'span', class_='sensenum')
-                
-                # Check for REGISTERLAB (register label) and ACTIV (activity)
-                registerlab = sense.find('span', class_='REGISTERLAB')
-                registerlab = registerlab.get_text(strip=True) if registerlab else ''
-                
-                activ = sense.find('span', class_='ACTIV')
-                activ = activ.get_text(strip=True) if activ else ''
-                
-                # Check for DEF span (definition)
-                definition_span = sense.find('span', class_='DEF')
-                definition = definition_span.get_text(strip=False) if definition_span else ''
-
-                # Check for RELATEDWD (related word)
-                relatedwd = sense.find('span', class_='RELATEDWD')
-                relatedwd = relatedwd.get_text(strip=True) if relatedwd else ''
-                
-                # Check for EXAMPLE (example sentence)
-                example = sense.find('span', class_='EXAMPLE')
-                example = example.get_text(strip=False) if example else ''
-
-                # Extract additional examples from GramExa
-                additional_examples = []
-                gram_exa = sense.find_all('span', class_='GramExa')
-                for exa in gram_exa:
-                    additional_example = exa.find('span', class_='EXAMPLE')
-                    if additional_example:
-                        additional_examples.append(additional_example.get_text(strip=True))
-
-                # Format each sense item as a <p> tag
-                sense_content = f'<p>{sensenum}. '
-                
-                # Add register label and activity
-                if registerlab:
-                    sense_content += f'<span style="color: #333399;"><em>{registerlab}</em></span> '
-                if activ:
-                    sense_content += f'<span style="color: #333399;"><em>{activ}</em></span> '
-                
-                sense_content += f'{definition} {relatedwd}<br />'
-
-                # Add the main example
-                if example:
-                    sense_content += f'<span style="color: #808080;"><em>&nbsp;&nbsp;{example}</em></span><br />'
-
-                # Add additional examples with indentation
-                for ex in additional_examples:
-                    sense_content += f'<span style="color: #808080;"><em>&nbsp;&nbsp;{ex}</em></span><br />'
-
-                # Close the <p> tag for the sense item
-                sense_content += '</p>'
-
-                # Add this sense content to the final output
-                output_html += sense_content
-        except Exception as e:
-            output_html = f"{e}"
-        # Return the final HTML output
-        return output_html
+    def createCardView(self):
+        # tkhtmlview is slow to import, so it is preloaded in the background and used only now
+        start = time.perf_counter()
+        from flashcore.cardview import CardView
+        self.card_text = CardView(self.root, cached_cards=self.configJson.get("rendered_card_cache", 8))
+        self.card_text.grid(row=0, column=2, padx=10, pady=10, sticky="nsew")
+        if self.pendingCard is not None:
+            self.writeFlashCard(*self.pendingCard)
+            self.pendingCard = None
+        self.trace.phase("card view", start)
+        self.reportStartup()
 
     def onClickdefine(self):
         word=self.addWordEntry.get()
-        htmlDef = self.get_word_def(word)
-        self.writeFlashCard(htmlDef)
+        self.session.show(word, flipped=True)
+        self.requestDefinition(word)
         self.rem_button.configure(state="disabled")
 
     def loadConfigFile(self):
-        with open(self.configFilePath,mode="r+") as configFile:
-            try:
-                self.configJson = json.load(configFile)
-            except Exception as e:
-                self.configJson={}
-            finally:
-                return self.configJson
+        self.configJson = load_config(self.configFilePath)
+        return self.configJson
         
-    def addToWordFile(self,word): 
-        self.lines.append(word)
-        with open(self.configJson['word_src_path'], "w") as srcFile:
-            srcFile.writelines(self.lines)
+    def addToWordFile(self,word):
+        """Append a word line to the deck and its file; returns the new index or None."""
+        return self.engine.add_word(word)
 
     def removeFromWordFile(self,word,index):
-        if(word in self.lines[index]):
-                self.lines.pop(index)
-        with open(self.configJson['word_src_path'], "w") as srcFile:
-            srcFile.writelines(self.lines)
+        if(self.words[index][0] == word):
+            self.engine.remove_word(index)
+            return True
+        return False
 
     def scrollListBox(self):
         self.word_listbox.yview_moveto(self.listBoxPos[0])
@@ -280,29 +255,42 @@ class FlashcardApp:
         return self.addWordEntry.get()
     
     def OnAddWord(self):
+        self.waitForDeck()
         word=self.getWordEntryData()
-        self.addToWordFile(f'{word}\n')
-        self.readWordSrcFile(self.configJson['word_src_path'])
-        self.LoadList()
+        added = self.addToWordFile(word)
+        self.deckEdited()
+        if added is not None:
+            self.refreshList()
         self.scrollListBox()
         self.clearWordEntry()
     
     def onClickRandom(self):
-        self.current_index = random.choice(range(len(self.words)))
-        self.is_flipped = False
-        self.definition_html = ""  # Reset the definition
+        if self.session.random() is not None:
+            self.update_card()
+
+    def onGrade(self,grade):
+        """Grade the current card and show the next due card, or a new one."""
+        self.waitForDeck()
+        position = self.engine.review(grade) if self.session.current_word else self.engine.next_card()
+        if position is None:
+            due = self.engine.scheduler.next_due_time()
+            when = time.strftime("%H:%M on %d %b", time.localtime(due)) if due else "tomorrow"
+            messagebox.showinfo("All done", f"No cards are due now; the next one is due at {when}.")
+            return
+        self.session.goto(position)
         self.update_card()
 
     def OnRemoveWord(self):
-        remWord,_=self.words[self.current_index]
-        for word,_ in self.words:
-            if(word == remWord):
-                self.removeFromWordFile(word,self.current_index)
-                self.readWordSrcFile(self.configJson['word_src_path'])
-                self.LoadList()
-                self.rem_button.configure(state="disabled")
-                self.scrollListBox()
-                break
+        self.waitForDeck()
+        index = self.session.current_index
+        remWord,_=self.words[index]
+        if not self.removeFromWordFile(remWord,index):
+            return
+        self.deckEdited()
+        self.word_listbox.selection_clear()
+        self.refreshList()
+        self.rem_button.configure(state="disabled")
+        self.scrollListBox()
 
     def write_config_file(self,configs:dict):
         with open(self.configFilePath,"r+") as configFile:
@@ -318,40 +306,12 @@ class FlashcardApp:
             return status
 
     def get_word_def(self,word):
-        def_raw=self.get_word_meaning(word)
-        formatted_def = self.convert_html_to_custom_format(def_raw)
-        return formatted_def
-    
-    def get_word_meaning(self,word):
-        """
-        This function takes a URL to a Longman Dictionary of Contemporary English page,
-        parses the page, and returns the meaning of the word in HTML format.
-        """
-        url = f"https://www.ldoceonline.com/dictionary/{word}"
-        # Send a GET request to the URL
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'}
-        response = requests.get(url,headers=headers)
-
-        # Check if the request was successful
-        if response.status_code == 200:
-            # Parse the page content with BeautifulSoup
-            soup = BeautifulSoup(response.content, 'html.parser')
-
-            # Find the element with the 'ldoceEntry' class (which contains the word's meaning)
-            entry = soup.find(class_='ldoceEntry')
-
-            if entry:
-                # Extract the meaning and format as HTML
-                return entry.prettify()  # This will give you the HTML formatted string
-            else:
-                return "Meaning not found."
-        else:
-            return f"Failed to retrieve the page. Status code: {response.status_code}"
+        return self.engine.define(word)
 
     def browse_src_file(self):
         path = filedialog.askopenfilename(
             title="Select a word source file",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+            filetypes=[("Text files", "*.txt"), ("Binary decks", "*.fdeck"), ("All files", "*.*")]
             )
         if(not path):
             return
@@ -372,46 +332,179 @@ class FlashcardApp:
 
         print(self.wordSrcTkVar)
 
-    def writeFlashCard(self,htmlData):
-        self.card_text.delete(1.0,tk.END)
-        self.card_text.set_html(htmlData)
+    def onClickExport(self):
+        """Export the deck with its definitions on a worker thread; progress shows in the title bar."""
+        from flashcore.export import DeckExporter
+        path = filedialog.asksaveasfilename(
+            title="Export the deck",
+            defaultextension=".csv",
+            filetypes=[("CSV", "*.csv"), ("Tab-separated", "*.tsv"), ("Anki import file", "*.txt")]
+            )
+        if not path:
+            return
+        fetch = messagebox.askyesno("Export", "Look up the definitions that are not cached yet?\n"
+                                              "This can take a while for a large deck.")
+        self.waitForDeck()
+        # the export thread iterates the live deck; an edit would change a list deck under it and
+        # the first edit of a binary deck would close the mapping it reads, so editing waits until it is done
+        words = self.words
+        self.setDeckEditable(False)
+        exporter = DeckExporter(self.engine.lookup, fetch=fetch, workers=4,
+                                progress=lambda message: None)
+        deck_name = os.path.splitext(os.path.basename(self.configJson.get("word_src_path") or "deck"))[0]
+        job = {"error": None}
+        def run():
+            try:
+                exporter.export(words, path, deck_name=deck_name, total=len(words))
+            except Exception as e:
+                job["error"] = e
+        thread = threading.Thread(target=run, name="export", daemon=True)
+        thread.start()
+        self.root.after(JOB_POLL_MS, self.pollExport, exporter, thread, job)
+
+    def pollExport(self,exporter,thread,job):
+        if thread.is_alive():
+            self.root.title(f"Flashcard App - exporting {exporter.stats.report()}")
+            self.root.after(JOB_POLL_MS, self.pollExport, exporter, thread, job)
+            return
+        self.root.title("Flashcard App")
+        self.setDeckEditable(True)
+        if job["error"] is not None:
+            messagebox.showerror("Export", f"export failed: {job['error']}")
+        else:
+            messagebox.showinfo("Export", f"Exported {exporter.stats.report()}")
+
+    def setDeckEditable(self,editable):
+        self.deckBusy = not editable
+        state = "normal" if editable else "disabled"
+        for button in (self.addWordButton, self.browseButton, self.importButton, self.exportButton):
+            button.configure(state=state)
+        if not editable:
+            # it comes back with the next selection, as after a removal
+            self.rem_button.configure(state="disabled")
+
+    def onClickImport(self):
+        """Pick new words out of a text or HTML document on a worker thread and add them in one write."""
+        from flashcore.vocabulary import VocabularyExtractor
+        path = filedialog.askopenfilename(
+            title="Import words from a document",
+            filetypes=[("Text or HTML", "*.txt *.html *.htm *.xhtml"), ("All files", "*.*")]
+            )
+        if not path:
+            return
+        limit = simpledialog.askinteger("Import", "How many of the rarest new words should be added?",
+                                        initialvalue=50, minvalue=1, parent=self.root)
+        if not limit:
+            return
+        self.waitForDeck()
+        extractor = VocabularyExtractor(self.engine.known_words())
+        job = {"words": None, "error": None}
+        def run():
+            try:
+                job["words"] = extractor.extract(path, limit=limit)
+            except Exception as e:
+                job["error"] = e
+        thread = threading.Thread(target=run, name="import", daemon=True)
+        thread.start()
+        # the words are added when the import finishes, which must not happen under an export
+        self.importButton.configure(state="disabled")
+        self.exportButton.configure(state="disabled")
+        self.root.after(JOB_POLL_MS, self.pollImport, extractor, thread, job)
+
+    def pollImport(self,extractor,thread,job):
+        if thread.is_alive():
+            self.root.title(f"Flashcard App - reading {extractor.stats.report()}")
+            self.root.after(JOB_POLL_MS, self.pollImport, extractor, thread, job)
+            return
+        self.root.title("Flashcard App")
+        self.importButton.configure(state="normal")
+        self.exportButton.configure(state="normal")
+        if job["error"] is not None:
+            messagebox.showerror("Import", f"import failed: {job['error']}")
+            return
+        # the deck is only edited here, on the Tk thread
+        added = self.engine.add_words(word for word, _ in job["words"])
+        self.deckEdited()
+        if len(added):
+            self.refreshList()
+            self.scrollListBox()
+        shown = ", ".join(self.words[i][0] for i in added[:20]) + (", ..." if len(added) > 20 else "")
+        messagebox.showinfo("Import", f"{len(added)} new words added. {shown}")
+
+    def writeFlashCard(self,htmlData,cache=True):
+        """Show htmlData on the card; long cards fill in over a few idle callbacks."""
+        if self.card_text is None:
+            self.pendingCard = (htmlData, cache)
+            return
+        with instrument.stage("render", self.session.current_word):
+            self.card_text.show(htmlData, cache=cache)
+
+    def pollFetcher(self):
+        self.fetcher.deliver()
+        self.root.after(FETCH_POLL_MS, self.pollFetcher)
+
+    def requestDefinition(self,word):
+        """Show the definition of word once it is available, without blocking the UI."""
+        instrument.card_started(word)
+        # cached cards, and fallbacks while the dictionary is failing, need no fetch
+        local = self.engine.local_card(word)
+        if local is not None:
+            self.onDefinitionReady(word, local)
+            return
+        if self.session.is_flipped:
+            self.writeFlashCard(f"<p>looking up <strong>{word}</strong>...</p>", cache=False)
+        self.fetcher.fetch(word, self.onDefinitionReady)
+
+    def onDefinitionReady(self,word,htmlDef):
+        # the user may have moved on while this was being fetched
+        if word != self.session.current_word:
+            return
+        self.session.definition_html = htmlDef
+        if self.session.is_flipped:
+            self.writeFlashCard(htmlDef)
+        if instrument.card_finished(word) is not None:
+            self.statusVar.set(instrument.active().summary())
     
     def update_card(self):
         """Update the card with the current word or meaning."""
-        word, _ = self.words[self.current_index]
-        self.definition_html = self.get_word_def(word)
-        if self.is_flipped:
-            # print(self.definition_html)
-            self.writeFlashCard(self.definition_html)
-        else:
+        word = self.session.current_word
+        if not self.session.is_flipped:
             self.writeFlashCard(word)
+        # fetched even when showing the front so that flipping is instant
+        self.requestDefinition(word)
+        self.prefetchAround()
+
+    def prefetchAround(self):
+        """Warm definitions for the cards the user is likely to open next."""
+        self.fetcher.prefetch(self.session.prefetch_window(self.configJson.get("prefetch_ahead", 3),
+                                                           self.configJson.get("prefetch_behind", 1)))
 
     def flip_card(self):
         """Flip the card to show the meaning or the word."""
-        self.is_flipped = not self.is_flipped
-        if self.is_flipped:
-            # Fetch the word definition only when flipping
-            self.definition_html = get_word_definition(self.current_word)
-        self.update_card()
+        session = self.session
+        if not session.current_word:
+            if self.words:
+                session.goto(session.current_index, flipped=True)
+                self.update_card()
+            return
+        session.is_flipped = not session.is_flipped
+        if not session.is_flipped:
+            self.writeFlashCard(session.current_word)
+        elif session.definition_html:
+            self.writeFlashCard(session.definition_html)
+        else:
+            self.requestDefinition(session.current_word)
 
     def show_next_word(self):
         """Show the next word in the list."""
-        if self.current_index < len(self.words) - 1:
-            self.current_index += 1
-            self.is_flipped = False
-            self.current_word = self.words[self.current_index][0]
-            self.definition_html = ""  # Reset the definition
+        if self.session.next() is not None:
             self.update_card()
         else:
             messagebox.showinfo("End of List", "You have reached the end of the list.")
 
     def show_previous_word(self):
         """Show the previous word in the list."""
-        if self.current_index > 0:
-            self.current_index -= 1
-            self.is_flipped = False
-            self.current_word = self.words[self.current_index][0]  # Update the current word
-            self.definition_html = ""  # Reset the definition
+        if self.session.previous() is not None:
             self.update_card()
         else:
             messagebox.showinfo("Start of List", "You are at the beginning of the list.")
@@ -424,68 +517,142 @@ class FlashcardApp:
         selected_index = self.word_listbox.curselection()
         if selected_index:
             # Get the word and its meaning from the list of words
-            self.current_index = selected_index[0]
-            self.is_flipped = True
+            self.session.goto(self.deckPosition(selected_index[0]), flipped=True)
             self.update_card()
-            self.rem_button.configure(state="active")
+            if not self.deckBusy:
+                self.rem_button.configure(state="active")
     
     def LoadList(self):
-        i = 1
-        self.word_listbox.delete(0,tk.END)
-        for word, _ in self.words:
-            self.word_listbox.insert(tk.END, f"{i}. {word}")
-            i = i + 1
+        # only the rows on screen are created, so this does not grow with the deck
+        self.listPositions = None
+        if self.searchVar.get():
+            self.searchVar.set("")
+        with instrument.stage("list.load"):
+            self.word_listbox.set_items(self.words, format_row=numbered_row)
         print("done loading")
 
+    def deckPosition(self,row):
+        """Translate a list row into a deck index (they differ while a search is active)."""
+        return row if self.listPositions is None else self.listPositions[row]
+
+    def refreshList(self):
+        if self.listPositions is None:
+            self.word_listbox.refresh()
+        else:
+            self.runSearch()
+
+    def onSearchChanged(self,*args):
+        # coalesce fast typing into one search once Tk is idle
+        if self.searchJob is not None:
+            self.root.after_cancel(self.searchJob)
+        self.searchJob = self.root.after_idle(self.runSearch)
+
+    def runSearch(self):
+        self.searchJob = None
+        query = self.searchVar.get()
+        if not query.strip():
+            if self.listPositions is not None:
+                self.listPositions = None
+                self.word_listbox.set_items(self.words, format_row=numbered_row)
+            return
+        self.listPositions = self.engine.search(query)
+        self.word_listbox.selection_clear()
+        self.word_listbox.set_items(self.listPositions,
+                                    format_row=lambda row, pos: numbered_row(pos, self.words[pos]))
+        self.word_listbox.yview_moveto(0)
+
+    def deckEdited(self):
+        """Catch up with an engine edit: a binary deck's first edit replaces the word list and its index."""
+        if self.words is not self.engine.words:
+            # the old list was a memory-mapped deck, closed once its cards were copied
+            self.words = self.engine.words
+            if self.listPositions is None:
+                self.word_listbox.set_items(self.words, format_row=numbered_row)
+        if self.indexJob is None and not self.engine.index.ready:
+            self.indexJob = self.root.after_idle(self.buildIndexStep)
+
+    def buildIndexStep(self):
+        # meaning and typo indexes are filled in a chunk at a time between UI events
+        if self.engine.index.build_step():
+            self.indexJob = None
+        else:
+            self.indexJob = self.root.after(INDEX_BUILD_MS, self.buildIndexStep)
+
     def readWordSrcFile(self,file_name):
-        """Load words and their meanings from a file."""
+        """Start loading words and their meanings from a file; the list fills in as it is read."""
 
         #check if file path is correct
         if(not self.verifySourceFile(file_name)):
             return
 
-        with open(file_name, "r") as file:
-            self.lines = file.readlines()
+        self.trace.begin("readWordSrcFile")
+        self.deckLoader = self.engine.start_loading(file_name)
+        self.words = self.engine.words
+        self.loadedRows = 0
+        if self.indexJob is not None:
+            self.root.after_cancel(self.indexJob)
+            self.indexJob = None
+        if self.deckJob is None:
+            self.deckJob = self.root.after(DECK_POLL_MS, self.pollDeckLoader)
+
+    def pollDeckLoader(self):
+        self.deckJob = None
+        loader = self.deckLoader
+        if loader is None:
+            return
+        done = loader.done  # checked first so the last rows are drawn before finishing
+        if len(self.words) != self.loadedRows:
+            self.loadedRows = len(self.words)
+            self.trace.mark("first rows")
+            if self.listPositions is None:
+                self.word_listbox.refresh()
+        if done:
+            self.deckLoaded(loader)
+        else:
+            self.deckJob = self.root.after(DECK_POLL_MS, self.pollDeckLoader)
 
-        words = []
+    def waitForDeck(self):
+        """Finish a background deck load now; the deck cannot change while it is being read."""
+        if self.deckLoader is None:
+            return
+        if self.deckJob is not None:
+            self.root.after_cancel(self.deckJob)
+            self.deckJob = None
+        self.deckLoader.wait()
+        self.pollDeckLoader()
+
+    def deckLoaded(self,loader):
+        self.deckLoader = None
+        file_name = loader.deck.path
         try:
-            with open(file_name, "r") as file:
-                for index,line in enumerate(file):
-                    if(line == '\n'):
-                        self.lines.pop(index)
-                    if " - " in line:
-                        word, meaning = line.strip().split(" - ", 1)
-                        words.append((word, meaning))
-                    else:
-                        word= line.strip()
-                        meaning=""
-                        words.append((word,meaning))
+            self.engine.finish_loading()
         except FileNotFoundError:
             messagebox.showerror("File Not Found", f"The file {file_name} was not found!.")
         except Exception as e:
             messagebox.showerror("Error",f"unable to load {file_name}: {e} ")
-        self.words = words
+        self.trace.end("readWordSrcFile")
+        if self.words is not self.engine.words:
+            self.words = self.engine.words
+            self.LoadList()
+        elif self.listPositions is not None:
+            # the search ran against a partly loaded deck
+            self.runSearch()
+        self.indexJob = self.root.after_idle(self.buildIndexStep)
+        if self.configJson.get("prefetch_deck_when_idle", False):
+            self.fetcher.prefetch_idle([word for word, _ in self.words])
+        self.reportStartup()
 
 if __name__ == "__main__":
-
-    # Determine if we are running as a PyInstaller bundle
-    # if getattr(sys, 'frozen', False):  # Running as a bundled app
-    #     # If running as an exe, use sys._MEIPASS to get the correct path
-    #     base_path = sys._MEIPASS
-    # else:  # Running as a script
-    #     base_path = os.path.dirname(os.path.abspath(__file__))
-
-    # Load words from the text file
-    # file_path = os.path.join(base_path, 'words.txt')
-    # words = load_words(file_path)
-    # if words:
-    #     # Create the main application window
-    #     root = tk.Tk()
-    #     app = FlashcardApp(root)
-    #     # app.update_card()
-    #     # app.LoadList(word=words)
-    #     root.mainloop()
-    # else:
-    #     print("No words to display.")
-    app = FlashcardApp()
-    app.root.mainloop()
\ No newline at end of file
+    # frozen builds start pool workers by re-running this script; let them through before argv is read
+    multiprocessing.freeze_support()
+    args = sys.argv[1:]
+    trace = StartupTrace(enabled="--trace-startup" in args, start=_startTime)
+    args = [arg for arg in args if arg != "--trace-startup"]
+    if args:
+        # command-line mode, e.g. `flashcard.py build-dict words.txt`
+        from flashcore.cli import main
+        sys.exit(main(args))
+    trace.phase("imports", _startTime, _importsDone)
+    preloadModules()
+    app = FlashcardApp(trace)
+    app.root.mainloop()
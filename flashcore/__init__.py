@@ -0,0 +1 @@
+"""Core building blocks used by the flashcard application. Only flashcore.listview and flashcore.cardview need Tk."""
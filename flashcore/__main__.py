@@ -0,0 +1,5 @@
+import sys
+
+from flashcore.cli import main
+
+sys.exit(main())
@@ -0,0 +1,80 @@
+"""
+Dictionary backends consulted by LookupService.
+
+configs.json lists them in priority order under "dictionaries":
+
+    "dictionaries": [
+        {"type": "stardict", "path": "~/dictionaries/wordnet.ifo"},
+        {"type": "ldoce"}
+    ]
+
+Local backends answer from files on disk in microseconds and need no
+network; ldoceonline.com (cached, with the circuit breaker) is the entry
+{"type": "ldoce"}. Backends listed after it are still tried when LDOCE has
+no entry or cannot be reached. Without a "dictionaries" key only LDOCE is
+used.
+"""
+import os
+import sys
+
+from flashcore import instrument
+
+LDOCE = "ldoce"
+
+
+class DictionaryBackend:
+    """A local dictionary: define() returns a formatted card, or None when it has no entry."""
+
+    name = "dictionary"
+
+    def define(self, word):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class StarDictBackend(DictionaryBackend):
+
+    def __init__(self, path):
+        from flashcore.stardict import StarDict
+        self.dictionary = StarDict(path)
+        self.name = self.dictionary.name
+
+    def define(self, word):
+        from flashcore.stardict import format_articles
+        with instrument.stage("local", word):
+            articles = self.dictionary.lookup(word)
+            return format_articles(word, articles, self.name) if articles else None
+
+    def close(self):
+        self.dictionary.close()
+
+
+BACKEND_TYPES = {
+    "stardict": StarDictBackend,
+}
+
+
+def from_config(configJson, config_dir):
+    """
+    The configured dictionaries in priority order: DictionaryBackend
+    instances, with LDOCE where the ldoce entry is. A dictionary that cannot
+    be opened is reported and skipped.
+    """
+    chain = []
+    for entry in configJson.get("dictionaries", [{"type": LDOCE}]):
+        kind = entry.get("type")
+        if kind == LDOCE:
+            chain.append(LDOCE)
+            continue
+        backend_type = BACKEND_TYPES.get(kind)
+        if backend_type is None:
+            print(f"unknown dictionary type {kind!r} in configs.json", file=sys.stderr)
+            continue
+        path = os.path.join(config_dir, os.path.expanduser(entry.get("path", "")))
+        try:
+            chain.append(backend_type(path))
+        except (OSError, ValueError) as e:
+            print(f"dictionary {path} could not be opened: {e}", file=sys.stderr)
+    return chain
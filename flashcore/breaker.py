@@ -0,0 +1,85 @@
+"""
+A circuit breaker for the dictionary site.
+
+After failure_threshold lookups in a row fail (connection errors, timeouts,
+5xx / 429 once the transport's retries run out) the circuit opens and
+allow() answers False at once, so lookups stop waiting on a site that is
+down. While it is open a single background probe is started every
+reset_seconds; the circuit closes again as soon as one succeeds. The delay
+between probes doubles after each failed one, up to max_reset_seconds.
+"""
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_SECONDS = 30
+MAX_RESET_SECONDS = 300
+
+
+class CircuitBreaker:
+
+    def __init__(self, probe, failure_threshold=DEFAULT_FAILURE_THRESHOLD,
+                 reset_seconds=DEFAULT_RESET_SECONDS, max_reset_seconds=MAX_RESET_SECONDS):
+        self.probe = probe  # callable returning True once the site answers properly again
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.max_reset_seconds = max_reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self._delay = reset_seconds
+        self._retry_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, configJson, probe):
+        return cls(
+            probe,
+            failure_threshold=configJson.get("breaker_failures", DEFAULT_FAILURE_THRESHOLD),
+            reset_seconds=configJson.get("breaker_reset_seconds", DEFAULT_RESET_SECONDS),
+        )
+
+    @property
+    def is_open(self):
+        return self.state == OPEN
+
+    def allow(self):
+        """True if a network attempt should be made now."""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self._probing or time.monotonic() < self._retry_at:
+                return False
+            self._probing = True
+        threading.Thread(target=self._run_probe, name="breaker-probe", daemon=True).start()
+        return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._delay = self.reset_seconds
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            # lookups that were already in flight when it opened do not push the next probe back
+            if self.state == CLOSED and self.failures >= self.failure_threshold:
+                self.state = OPEN
+                self._retry_at = time.monotonic() + self._delay
+
+    def _run_probe(self):
+        try:
+            ok = self.probe()
+        except Exception:
+            ok = False
+        if ok:
+            self.record_success()
+        with self._lock:
+            if not ok:
+                self._delay = min(self.max_reset_seconds, self._delay * 2)
+                self._retry_at = time.monotonic() + self._delay
+            self._probing = False
@@ -0,0 +1,214 @@
+"""
+Bulk builder that fills the definition cache for a whole word list.
+
+Pages are downloaded by a few threads behind a polite rate limiter, parsed
+in a process pool (BeautifulSoup parsing is CPU-bound), and written to the
+cache from the calling thread. Words that are already cached, or that a
+previous run recorded in the checkpoint file, are skipped, so an
+interrupted build can simply be started again. A build that would not fit
+within the cache's entry or size limit is refused up front: the cache
+would evict its own earlier results and the build would never finish.
+"""
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from flashcore import ldoce_parser
+from flashcore.cache import normalize_word
+
+# assumed size of one cached entry while the cache is still empty
+ESTIMATED_ENTRY_BYTES = 16 << 10
+
+
+class RateLimiter:
+    """Spaces calls to acquire() at least 1/rate seconds apart, across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate > 0 else 0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+def parse_page(page):
+    """Return (raw_html, formatted) for a dictionary page, or None if it has no entry."""
+    entry = ldoce_parser.extract_entry(page)
+    if entry is None:
+        return None
+    return str(entry), ldoce_parser.format_entry(entry)
+
+
+class Checkpoint:
+    """Append-only list of words that were looked up and had no entry."""
+
+    def __init__(self, path):
+        self.path = path
+        self.words = set()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                self.words = {line.rstrip("\n") for line in file if line.strip()}
+        self._file = open(path, "a", encoding="utf-8")
+
+    def add(self, word):
+        key = normalize_word(word)
+        if key not in self.words:
+            self.words.add(key)
+            self._file.write(key + "\n")
+            self._file.flush()
+
+    def __contains__(self, word):
+        return normalize_word(word) in self.words
+
+    def close(self):
+        self._file.close()
+
+
+class BuildStats:
+    def __init__(self, total):
+        self.total = total
+        self.stored = 0
+        self.evicted = 0
+        self.revalidated = 0
+        self.not_found = 0
+        self.failed = 0
+        self.started = time.monotonic()
+
+    @property
+    def done(self):
+        return self.stored + self.revalidated + self.not_found + self.failed
+
+    def report(self):
+        elapsed = time.monotonic() - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        eta = (self.total - self.done) / rate if rate else 0.0
+        return (f"{self.done}/{self.total} words  {rate:.2f} words/s  eta {eta:.0f}s  "
+                f"stored={self.stored} evicted={self.evicted} revalidated={self.revalidated} "
+                f"not_found={self.not_found} failed={self.failed}")
+
+
+class DictionaryBuilder:
+
+    def __init__(self, cache, transport, concurrency=4, rate=2.0, processes=None,
+                 checkpoint_path=None, progress=print, progress_interval=2.0):
+        self.cache = cache
+        self.transport = transport
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(rate)
+        self.processes = processes
+        self.checkpoint_path = checkpoint_path or cache.path + ".checkpoint"
+        self.progress = progress
+        self.progress_interval = progress_interval
+
+    def pending_words(self, words, checkpoint):
+        seen = set()
+        for word in words:
+            key = normalize_word(word)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            if key in checkpoint or self.cache.get(word) is not None:
+                continue
+            yield word
+
+    def check_capacity(self, pending):
+        """Raise ValueError if pending more definitions would push the cache over its limits."""
+        count, total = self.cache.usage()
+        entry_bytes = total / count if count else ESTIMATED_ENTRY_BYTES
+        if count + pending > self.cache.max_entries:
+            raise ValueError(
+                f"{pending} words to fetch but the cache holds at most {self.cache.max_entries} entries "
+                f"({count} already cached); raise def_cache_max_entries in configs.json")
+        if total + pending * entry_bytes > self.cache.max_bytes:
+            needed = (total + pending * entry_bytes) / (1 << 20)
+            raise ValueError(
+                f"{pending} words to fetch need about {needed:.1f} MB but the cache holds at most "
+                f"{self.cache.max_bytes / (1 << 20):.1f} MB; raise def_cache_max_mb in configs.json")
+
+    def _fetch(self, word):
+        self.limiter.acquire()
+        stale = self.cache.get_stale(word)
+        response = self.transport.get_word_page(word, stale)
+        if response.status_code == 304 and stale:
+            return response, None
+        return response, ldoce_parser.decode_page(response) if response.status_code == 200 else None
+
+    def build(self, words):
+        """Fill the cache for every word and return the final BuildStats (ValueError if it would not fit)."""
+        checkpoint = Checkpoint(self.checkpoint_path)
+        try:
+            todo = list(self.pending_words(words, checkpoint))
+            self.check_capacity(len(todo))
+            stats = BuildStats(len(todo))
+            self.progress(f"{len(todo)} words to fetch")
+            queue = iter(todo)
+            fetching = {}
+            parsing = {}
+            last_report = time.monotonic()
+            with ThreadPoolExecutor(self.concurrency, thread_name_prefix="build-fetch") as fetchers, \
+                    ProcessPoolExecutor(self.processes) as parsers:
+                while True:
+                    # keep a couple of fetches queued per worker, but never the whole list
+                    while len(fetching) < self.concurrency * 2:
+                        word = next(queue, None)
+                        if word is None:
+                            break
+                        fetching[fetchers.submit(self._fetch, word)] = word
+                    if not fetching and not parsing:
+                        break
+                    done, _ = wait(list(fetching) + list(parsing), return_when=FIRST_COMPLETED)
+                    for future in done:
+                        if future in fetching:
+                            self._fetched(fetching.pop(future), future, parsers, parsing, checkpoint, stats)
+                        else:
+                            self._parsed(parsing.pop(future), future, checkpoint, stats)
+                    if time.monotonic() - last_report >= self.progress_interval:
+                        last_report = time.monotonic()
+                        self.progress(stats.report())
+        finally:
+            checkpoint.close()
+        self.progress(stats.report())
+        return stats
+
+    def _fetched(self, word, future, parsers, parsing, checkpoint, stats):
+        try:
+            response, page = future.result()
+        except Exception as e:
+            stats.failed += 1
+            self.progress(f"{word}: {e}")
+            return
+        if response.status_code == 304:
+            self.cache.revalidated(word)
+            stats.revalidated += 1
+        elif response.status_code == 404:
+            checkpoint.add(word)
+            stats.not_found += 1
+        elif page is None:
+            stats.failed += 1
+            self.progress(f"{word}: status code {response.status_code}")
+        else:
+            headers = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            parsing[parsers.submit(parse_page, page)] = (word, headers)
+
+    def _parsed(self, item, future, checkpoint, stats):
+        word, (etag, last_modified) = item
+        try:
+            result = future.result()
+        except Exception as e:
+            stats.failed += 1
+            self.progress(f"{word}: {e}")
+            return
+        if result is None:
+            checkpoint.add(word)
+            stats.not_found += 1
+            return
+        raw_html, formatted = result
+        stats.evicted += self.cache.put(word, raw_html, formatted, etag=etag, last_modified=last_modified)
+        stats.stored += 1
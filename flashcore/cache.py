@@ -0,0 +1,242 @@
+import html
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_MB = 50
+DEFAULT_TTL_DAYS = 30
+DEFAULT_NOT_FOUND_TTL_HOURS = 24
+DEFAULT_FAILURE_TTL_SECONDS = 60
+
+CachedDefinition = namedtuple("CachedDefinition", "raw_html formatted etag last_modified")
+
+_TAG = re.compile(r"<[^>]+>")
+_FTS_TOKEN = re.compile(r"[^\W_]+")
+_SPACES = re.compile(r"[ \t]+")
+
+
+def plain_text(formatted):
+    """Strip the markup from a formatted card."""
+    return html.unescape(_TAG.sub(" ", formatted))
+
+
+def card_text(formatted):
+    """A formatted card as readable text, one line per paragraph or line break."""
+    return _SPACES.sub(" ", plain_text(formatted.replace("<br />", "\n").replace("</p>", "\n"))).strip()
+
+
+def normalize_word(word):
+    """Normalize a word so 'Run', ' run ' and 'run' share one cache entry."""
+    return " ".join(word.split()).lower()
+
+
+class DefinitionCache:
+    """
+    Persistent definition cache backed by SQLite.
+
+    Each row keeps the raw ldoceEntry HTML and the formatted card built from it.
+    Entries older than the TTL are treated as misses by get(), but are kept
+    (with their ETag / Last-Modified) so they can be revalidated with a
+    conditional GET. The least recently used rows are evicted once the entry
+    count or total size exceeds the limit.
+
+    When SQLite has FTS5, the plain text of every formatted card is also kept
+    in a full-text index so the deck search can match definitions.
+
+    Lookups that produced no card are kept in a separate table for a short
+    while (a day for "no entry", a minute for a failed request), so moving
+    back and forth over such a word does not ask the site again each time.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES, max_mb=DEFAULT_MAX_MB, ttl_days=DEFAULT_TTL_DAYS,
+                 not_found_ttl_hours=DEFAULT_NOT_FOUND_TTL_HOURS, failure_ttl_seconds=DEFAULT_FAILURE_TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.ttl = ttl_days * 24 * 60 * 60
+        self.not_found_ttl = not_found_ttl_hours * 60 * 60
+        self.failure_ttl = failure_ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS definitions ("
+            " word TEXT PRIMARY KEY,"
+            " raw_html TEXT NOT NULL,"
+            " formatted TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " etag TEXT,"
+            " last_modified TEXT)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(definitions)")}
+        for column in ("etag", "last_modified"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE definitions ADD COLUMN {column} TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS definitions_lru ON definitions(accessed_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS misses ("
+            " word TEXT PRIMARY KEY,"
+            " reason TEXT NOT NULL,"
+            " not_found INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self.searchable = self._create_text_index()
+
+    def _create_text_index(self):
+        exists = self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'definition_text'").fetchone() is not None
+        if exists:
+            return True
+        try:
+            # rowids mirror the definitions table
+            self._conn.execute("CREATE VIRTUAL TABLE definition_text USING fts5(body)")
+        except sqlite3.OperationalError:
+            return False
+        rows = self._conn.execute("SELECT rowid, formatted FROM definitions").fetchall()
+        self._conn.executemany("INSERT INTO definition_text (rowid, body) VALUES (?, ?)",
+                               ((rowid, plain_text(formatted)) for rowid, formatted in rows))
+        return True
+
+    @classmethod
+    def from_config(cls, configJson, config_dir):
+        """Build a cache from configs.json settings, stored next to the config file."""
+        path = configJson.get("def_cache_path") or os.path.join(config_dir, "definitions.db")
+        return cls(
+            path,
+            max_entries=configJson.get("def_cache_max_entries", DEFAULT_MAX_ENTRIES),
+            max_mb=configJson.get("def_cache_max_mb", DEFAULT_MAX_MB),
+            ttl_days=configJson.get("def_cache_ttl_days", DEFAULT_TTL_DAYS),
+            not_found_ttl_hours=configJson.get("not_found_ttl_hours", DEFAULT_NOT_FOUND_TTL_HOURS),
+            failure_ttl_seconds=configJson.get("failure_ttl_seconds", DEFAULT_FAILURE_TTL_SECONDS),
+        )
+
+    def get(self, word):
+        """Return a CachedDefinition for word, or None on a miss or expired entry."""
+        return self._get(word, allow_stale=False)
+
+    def get_stale(self, word):
+        """Like get(), but also return expired entries so they can be revalidated."""
+        return self._get(word, allow_stale=True)
+
+    def _get(self, word, allow_stale):
+        key = normalize_word(word)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT raw_html, formatted, etag, last_modified, fetched_at FROM definitions WHERE word = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if not allow_stale and self.ttl and now - row[4] > self.ttl:
+                return None
+            self._conn.execute("UPDATE definitions SET accessed_at = ? WHERE word = ?", (now, key))
+        return CachedDefinition(*row[:4])
+
+    def put(self, word, raw_html, formatted, etag=None, last_modified=None):
+        """Store a definition, evict old entries if the cache is over its limits and return how many were."""
+        key = normalize_word(word)
+        now = time.time()
+        size = len(raw_html.encode("utf-8")) + len(formatted.encode("utf-8"))
+        with self._lock:
+            if self.searchable:
+                old = self._conn.execute("SELECT rowid FROM definitions WHERE word = ?", (key,)).fetchone()
+                if old:
+                    self._conn.execute("DELETE FROM definition_text WHERE rowid = ?", old)
+            cursor = self._conn.execute(
+                "INSERT OR REPLACE INTO definitions"
+                " (word, raw_html, formatted, size, fetched_at, accessed_at, etag, last_modified)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, raw_html, formatted, size, now, now, etag, last_modified),
+            )
+            if self.searchable:
+                self._conn.execute("INSERT INTO definition_text (rowid, body) VALUES (?, ?)",
+                                   (cursor.lastrowid, plain_text(formatted)))
+            self._conn.execute("DELETE FROM misses WHERE word = ?", (key,))
+            return self._evict()
+
+    def get_miss(self, word):
+        """The reason recorded by put_miss() if word's last lookup failed recently, else None."""
+        key = normalize_word(word)
+        with self._lock:
+            row = self._conn.execute("SELECT reason, expires_at FROM misses WHERE word = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= time.time():
+                self._conn.execute("DELETE FROM misses WHERE word = ?", (key,))
+                return None
+        return row[0]
+
+    def put_miss(self, word, reason, not_found=False):
+        """Remember that looking up word gave no card: a missing entry, or a failed request."""
+        ttl = self.not_found_ttl if not_found else self.failure_ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO misses (word, reason, not_found, expires_at) VALUES (?, ?, ?, ?)",
+                (normalize_word(word), reason, int(not_found), time.time() + ttl))
+
+    def clear_failures(self):
+        """Forget failed requests (not missing entries), e.g. once the site is reachable again."""
+        with self._lock:
+            self._conn.execute("DELETE FROM misses WHERE not_found = 0")
+
+    def search_words(self, query, limit=200):
+        """Normalized words whose cached definition contains every query term (the last as a prefix)."""
+        terms = _FTS_TOKEN.findall(query.lower())
+        if not self.searchable or not terms:
+            return []
+        match = " ".join(f'"{term}"' for term in terms) + "*"
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT d.word FROM definition_text t JOIN definitions d ON d.rowid = t.rowid"
+                " WHERE definition_text MATCH ? LIMIT ?", (match, limit)).fetchall()
+        return [word for (word,) in rows]
+
+    def revalidated(self, word):
+        """Mark an entry fresh again after the server answered 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE definitions SET fetched_at = ?, accessed_at = ? WHERE word = ?", (now, now, normalize_word(word))
+            )
+
+    def _evict(self):
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM definitions").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return 0
+        # walk from the least recently used end until both limits are met
+        doomed = []
+        for rowid, size in self._conn.execute("SELECT rowid, size FROM definitions ORDER BY accessed_at"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((rowid,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM definitions WHERE rowid = ?", doomed)
+        if self.searchable:
+            self._conn.executemany("DELETE FROM definition_text WHERE rowid = ?", doomed)
+        return len(doomed)
+
+    def usage(self):
+        """(entries, bytes) currently stored, to compare with max_entries and max_bytes."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM definitions").fetchone()
+
+    def __contains__(self, word):
+        return self.get(word) is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM definitions").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,98 @@
+"""
+The card display: progressive rendering plus a cache of rendered cards.
+
+A formatted card is a header paragraph followed by one paragraph per
+sense. The header and the first few senses are rendered at once and the
+rest is appended a few paragraphs per idle callback, so a long entry shows
+up immediately and the UI keeps responding while it fills in.
+
+Every rendered card keeps its own HTMLScrolledText; the most recent ones
+stay alive, stacked in the same grid cell, and showing one of them again
+(flipping back and forth, revisiting a card) is just a raise.
+"""
+import tkinter as tk
+from collections import OrderedDict
+
+from tkhtmlview import HTMLScrolledText
+
+FIRST_SENSES = 3    # senses rendered together with the header
+SENSES_PER_STEP = 3
+CACHED_CARDS = 8
+
+
+def split_card(html, first=FIRST_SENSES, per_step=SENSES_PER_STEP):
+    """Split card HTML at paragraph ends into the part to render now and the parts to append later."""
+    paragraphs = html.split('</p>')
+    if len(paragraphs) <= first + 2:
+        return [html]
+    tail = paragraphs.pop()
+    paragraphs = [paragraph + '</p>' for paragraph in paragraphs]
+    paragraphs[-1] += tail
+    chunks = [''.join(paragraphs[:first + 1])]
+    for start in range(first + 1, len(paragraphs), per_step):
+        chunks.append(''.join(paragraphs[start:start + per_step]))
+    return chunks
+
+
+class CardView(tk.Frame):
+
+    def __init__(self, master, cached_cards=CACHED_CARDS, **kwargs):
+        super().__init__(master)
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+        self._kwargs = kwargs
+        self._cached_cards = cached_cards
+        self._cards = OrderedDict()  # card html -> [widget, pending idle job or None]
+        self._scratch = None         # for content that is not worth caching
+        self._current = None
+
+    def show(self, html, cache=True):
+        """Display html, reusing an already rendered widget for it when there is one."""
+        card = self._cards.get(html)
+        if card is not None:
+            self._cards.move_to_end(html)
+            self._raise(card[0])
+            return
+        if not cache:
+            if self._scratch is None:
+                self._scratch = self._new_widget()
+            self._scratch.set_html(html)
+            self._raise(self._scratch)
+            return
+        widget = self._new_widget()
+        card = self._cards[html] = [widget, None]
+        chunks = split_card(html)
+        widget.set_html(chunks[0])
+        if len(chunks) > 1:
+            card[1] = self.after_idle(self._append, card, chunks, 1)
+        self._raise(widget)
+        self._evict()
+
+    def _new_widget(self):
+        widget = HTMLScrolledText(self, html="", **self._kwargs)
+        widget.grid(row=0, column=0, sticky="nsew")
+        return widget
+
+    def _raise(self, widget):
+        widget.frame.tkraise()
+        self._current = widget
+
+    def _append(self, card, chunks, index):
+        widget = card[0]
+        state = widget.cget("state")
+        widget.config(state=tk.NORMAL)
+        widget.mark_set(tk.INSERT, "end-1c")
+        widget.html_parser.w_set_html(widget, chunks[index], strip=True)
+        widget.config(state=state)
+        index += 1
+        card[1] = self.after_idle(self._append, card, chunks, index) if index < len(chunks) else None
+
+    def _evict(self):
+        while len(self._cards) > self._cached_cards:
+            html, (widget, job) = next(iter(self._cards.items()))
+            if widget is self._current:
+                break
+            del self._cards[html]
+            if job is not None:
+                self.after_cancel(job)
+            widget.frame.destroy()
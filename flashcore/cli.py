@@ -0,0 +1,236 @@
+"""
+Command-line entry points. They never import Tk, so they work on headless
+machines: `python -m flashcore ...`, or flashcard.py with arguments.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flashcore import instrument
+from flashcore.cache import card_text
+from flashcore.deck import iter_deck
+from flashcore.engine import FlashcardEngine
+
+
+def _render(html, args):
+    if args.html:
+        return html
+    return card_text(html)
+
+
+def _timed_define(engine, word):
+    instrument.card_started(word)
+    start = time.perf_counter()
+    html, source = engine.define_with_source(word)
+    seconds = time.perf_counter() - start
+    instrument.card_finished(word)
+    return html, source, seconds
+
+
+def _timing_line(word, seconds, source):
+    line = f"{word}: {seconds * 1000:.1f} ms ({source})"
+    instruments = instrument.active()
+    if instruments is not None and instruments.last_card and instruments.last_card[0] == word:
+        line += "  " + " ".join(f"{name} {ms:.1f}" for name, ms in instruments.last_card[2].items())
+    return line
+
+
+def _summary(label, timings, elapsed):
+    ms = sorted(t * 1000 for t in timings)
+    if not ms:
+        return f"{label}: nothing to do"
+    p95 = ms[min(len(ms) - 1, int(len(ms) * 0.95))]
+    return (f"{label}: {len(ms)} words in {elapsed:.2f}s ({len(ms) / elapsed:.1f} words/s)  "
+            f"p50 {statistics.median(ms):.1f} ms  p95 {p95:.1f} ms  max {ms[-1]:.1f} ms")
+
+
+def define(args, engine):
+    timings = []
+    start = time.perf_counter()
+    for word in args.words:
+        html, source, seconds = _timed_define(engine, word)
+        timings.append(seconds)
+        print(_render(html, args))
+        print(_timing_line(word, seconds, source), file=sys.stderr)
+    if len(timings) > 1:
+        print(_summary("define", timings, time.perf_counter() - start), file=sys.stderr)
+    return 0
+
+
+def batch(args, engine):
+    word_file = args.word_file or engine.configJson.get("word_src_path")
+    if not word_file or not os.path.exists(word_file):
+        print(f"word source file not found: {word_file}", file=sys.stderr)
+        return 1
+    words = [word for word, _ in iter_deck(word_file)]
+    output = open(args.output, "w", encoding="utf-8") if args.output else None
+    timings = []
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(args.workers) as pool:
+            for word, (html, source, seconds) in zip(words, pool.map(lambda w: _timed_define(engine, w), words)):
+                timings.append(seconds)
+                if output:
+                    output.write(json.dumps({"word": word, "source": source, "ms": round(seconds * 1000, 2),
+                                             "html": html}) + "\n")
+                if args.verbose:
+                    print(f"{word}: {seconds * 1000:.1f} ms ({source})", file=sys.stderr)
+    finally:
+        if output:
+            output.close()
+    print(_summary("batch", timings, time.perf_counter() - start), file=sys.stderr)
+    return 0
+
+
+def build_dict(args, engine):
+    from flashcore.builder import DictionaryBuilder
+
+    word_file = args.word_file or engine.configJson.get("word_src_path")
+    if not word_file or not os.path.exists(word_file):
+        print(f"word source file not found: {word_file}")
+        return 1
+    builder = DictionaryBuilder(
+        engine.cache,
+        engine.transport,
+        concurrency=args.concurrency,
+        rate=args.rate,
+        processes=args.processes,
+    )
+    if args.restart and os.path.exists(builder.checkpoint_path):
+        os.remove(builder.checkpoint_path)
+    try:
+        stats = builder.build(word for word, _ in iter_deck(word_file))
+    except ValueError as e:
+        print(e)
+        return 1
+    return 1 if stats.failed else 0
+
+
+def convert(args, engine):
+    from flashcore.deckfile import binary_to_text, is_binary_deck, text_to_binary
+
+    if not os.path.exists(args.source):
+        print(f"word source file not found: {args.source}", file=sys.stderr)
+        return 1
+    start = time.perf_counter()
+    if is_binary_deck(args.source):
+        count = binary_to_text(args.source, args.destination)
+    else:
+        count = text_to_binary(args.source, args.destination)
+    print(f"{count} cards written to {args.destination} in {time.perf_counter() - start:.2f}s", file=sys.stderr)
+    return 0
+
+
+def export(args, engine):
+    from flashcore.export import DeckExporter
+
+    word_file = args.word_file or engine.configJson.get("word_src_path")
+    if not word_file or not os.path.exists(word_file):
+        print(f"word source file not found: {word_file}", file=sys.stderr)
+        return 1
+    exporter = DeckExporter(engine.lookup, fetch=args.fetch, workers=args.workers, plain=args.plain,
+                            progress=lambda message: print(message, file=sys.stderr))
+    deck_name = args.deck_name or os.path.splitext(os.path.basename(word_file))[0]
+    exporter.export(iter_deck(word_file), args.output, fmt=args.format, deck_name=deck_name)
+    return 0
+
+
+def import_words(args, engine):
+    from flashcore.vocabulary import STOP_WORDS, VocabularyExtractor
+
+    word_file = args.word_file or engine.configJson.get("word_src_path")
+    if not word_file or not os.path.exists(word_file):
+        print(f"word source file not found: {word_file}", file=sys.stderr)
+        return 1
+    if not os.path.exists(args.document):
+        print(f"document not found: {args.document}", file=sys.stderr)
+        return 1
+    stop_words = STOP_WORDS
+    if args.stop_words:
+        with open(args.stop_words, encoding="utf-8") as extra:
+            stop_words = STOP_WORDS | {line.strip().lower() for line in extra if line.strip()}
+    engine.load_deck(word_file)
+    extractor = VocabularyExtractor(engine.known_words(), stop_words=stop_words, min_count=args.min_count,
+                                    workers=args.processes)
+    words = extractor.extract(args.document, limit=args.limit, markup=True if args.html else None)
+    print(extractor.stats.report(), file=sys.stderr)
+    for word, count in words:
+        print(f"{word}\t{count}")
+    if args.dry_run:
+        return 0
+    added = engine.add_words(word for word, _ in words)
+    print(f"{len(added)} words added to {word_file}", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="flashcard")
+    parser.add_argument("--config", default=None, help="path to configs.json")
+    parser.add_argument("--trace-out", metavar="FILE", help="write per-stage timings as Chrome trace-event JSON")
+    parser.add_argument("--timings-csv", metavar="FILE", help="append per-stage timings to a rolling CSV file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    define_cmd = commands.add_parser("define", help="print the definition card for one or more words")
+    define_cmd.add_argument("words", nargs="+")
+    define_cmd.add_argument("--html", action="store_true", help="print the card HTML instead of plain text")
+    define_cmd.set_defaults(handler=define)
+
+    batch_cmd = commands.add_parser("batch", help="define every word of a word source file and report timing")
+    batch_cmd.add_argument("word_file", nargs="?", help="word source file (defaults to word_src_path)")
+    batch_cmd.add_argument("--workers", type=int, default=4, help="parallel lookups")
+    batch_cmd.add_argument("--output", help="write one JSON object per word to this file")
+    batch_cmd.add_argument("--verbose", "-v", action="store_true", help="print the timing of every word")
+    batch_cmd.set_defaults(handler=batch)
+
+    build = commands.add_parser("build-dict", help="fetch and cache definitions for a whole word list")
+    build.add_argument("word_file", nargs="?", help="word source file (defaults to word_src_path)")
+    build.add_argument("--concurrency", type=int, default=4, help="parallel downloads")
+    build.add_argument("--rate", type=float, default=2.0, help="maximum requests per second")
+    build.add_argument("--processes", type=int, default=None, help="parser processes (default: CPU count)")
+    build.add_argument("--restart", action="store_true", help="forget words recorded as not found")
+    build.set_defaults(handler=build_dict)
+
+    convert_cmd = commands.add_parser("convert", help="convert a word source file to a binary deck or back")
+    convert_cmd.add_argument("source", help="a '<word> - <meaning>' text file or a binary deck")
+    convert_cmd.add_argument("destination", help="written as a binary deck if source is text, as text otherwise")
+    convert_cmd.set_defaults(handler=convert)
+
+    export_cmd = commands.add_parser("export", help="write a deck with its definitions as CSV, TSV or an Anki import file")
+    export_cmd.add_argument("output", help="file to write; .tsv and .txt (Anki) pick the format unless --format is given")
+    export_cmd.add_argument("word_file", nargs="?", help="word source file or binary deck (defaults to word_src_path)")
+    export_cmd.add_argument("--format", choices=("csv", "tsv", "anki"), default=None)
+    export_cmd.add_argument("--fetch", action="store_true", help="look up definitions that are not cached yet")
+    export_cmd.add_argument("--workers", type=int, default=4, help="parallel lookups with --fetch")
+    export_cmd.add_argument("--plain", action="store_true", help="write definitions as plain text instead of HTML")
+    export_cmd.add_argument("--deck-name", help="Anki deck to import into (default: the word file's name)")
+    export_cmd.set_defaults(handler=export)
+
+    import_cmd = commands.add_parser("import", help="add the rarest new words of a text or HTML document to the deck")
+    import_cmd.add_argument("document", help="text or HTML file, read in chunks however large")
+    import_cmd.add_argument("word_file", nargs="?", help="word source file or binary deck (defaults to word_src_path)")
+    import_cmd.add_argument("--limit", type=int, default=100, help="most words to add (0 for all)")
+    import_cmd.add_argument("--min-count", type=int, default=2, help="ignore words seen fewer times in the document")
+    import_cmd.add_argument("--stop-words", metavar="FILE", help="more words to ignore, one per line")
+    import_cmd.add_argument("--html", action="store_true", help="strip markup even if the file does not look like HTML")
+    import_cmd.add_argument("--processes", type=int, default=None, help="tokenizer processes (default: CPU count)")
+    import_cmd.add_argument("--dry-run", action="store_true", help="print the words without adding them")
+    import_cmd.set_defaults(handler=import_words)
+
+    args = parser.parse_args(argv)
+    engine = FlashcardEngine.from_config_file(args.config)
+    instruments = instrument.active()
+    if (args.trace_out or args.timings_csv) and instruments is None:
+        instruments = instrument.enable()
+    if args.timings_csv:
+        instruments.open_csv(args.timings_csv)
+    try:
+        return args.handler(args, engine)
+    finally:
+        if args.trace_out:
+            instruments.export_chrome_trace(args.trace_out)
+        engine.close()
+        instrument.disable()
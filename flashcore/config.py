@@ -0,0 +1,24 @@
+import json
+import os
+import sys
+
+
+def base_path():
+    """Directory holding configs.json: the bundle dir when frozen, else the project dir."""
+    if getattr(sys, 'frozen', False):  # Running as a bundled app
+        # If running as an exe, use sys._MEIPASS to get the correct path
+        return sys._MEIPASS
+    return os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def config_file_path():
+    return os.path.join(base_path(), 'configs.json')
+
+
+def load_config(path):
+    """Read configs.json, returning an empty dict if it cannot be parsed."""
+    with open(path, mode="r") as configFile:
+        try:
+            return json.load(configFile)
+        except Exception:
+            return {}
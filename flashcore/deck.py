@@ -0,0 +1,234 @@
+import os
+import tempfile
+import threading
+import time
+
+from flashcore import instrument
+from flashcore.deckfile import FLAG_HAS_MEANING, MappedWords, is_binary_deck, write_binary_deck
+
+
+def parse_word_line(line):
+    """Split a word source line of the form '<word>' or '<word> - <meaning>'."""
+    if " - " in line:
+        word, meaning = line.strip().split(" - ", 1)
+        return word, meaning
+    return line.strip(), ""
+
+
+def format_word_line(word, meaning=""):
+    return f"{word} - {meaning}" if meaning else word
+
+
+def read_words(file_name):
+    """Yield (word, meaning) for every non-blank line of a word source file."""
+    with open(file_name, "r") as file:
+        for line in file:
+            if line.strip():
+                yield parse_word_line(line)
+
+
+def iter_deck(file_name):
+    """Yield (word, meaning) for every card of a word source file or a binary deck."""
+    if not is_binary_deck(file_name):
+        yield from read_words(file_name)
+        return
+    words = MappedWords(file_name)
+    try:
+        yield from words
+    finally:
+        words.close()
+
+
+def _ends_with_newline(file_name):
+    with open(file_name, "rb") as file:
+        if not file.seek(0, os.SEEK_END):
+            return True
+        file.seek(-1, os.SEEK_END)
+        return file.read(1) == b"\n"
+
+
+class Deck:
+    """
+    In-memory word list that is the source of truth for a word source file.
+
+    words holds one (word, meaning) tuple per non-blank line, so list indexes
+    always match deck indexes. Additions are appended to the file in O(1);
+    removals rewrite it to a temporary file that atomically replaces the
+    original, so a crash never leaves a half-written word list.
+
+    A binary deck (see flashcore.deckfile) is opened memory-mapped instead,
+    so words is a read-only sequence that decodes cards on access. The first
+    edit copies it into a list (materialize()) and every edit then rewrites
+    the binary file, keeping each card's metadata.
+    """
+
+    def __init__(self, path=None, words=None):
+        self.path = path
+        self.words = words if words is not None else []
+        self.binary = isinstance(self.words, MappedWords)
+        self._meta = None  # (added, flags) per card once a binary deck is materialized
+        self._ends_with_newline = True
+
+    @classmethod
+    def load(cls, path):
+        with instrument.stage("deck.read"):
+            if is_binary_deck(path):
+                return cls(path, MappedWords(path))
+            deck = cls(path, list(read_words(path)))
+            deck._ends_with_newline = _ends_with_newline(path)
+        return deck
+
+    @property
+    def mapped(self):
+        return isinstance(self.words, MappedWords)
+
+    def materialize(self):
+        """Copy a memory-mapped deck into a list so it can be edited; no-op otherwise."""
+        if not self.mapped:
+            return
+        mapped = self.words
+        self.words = list(mapped)
+        self._meta = [(mapped.added(i), mapped.flags(i)) for i in range(len(mapped))]
+        mapped.close()
+
+    def close(self):
+        if self.mapped:
+            self.words.close()
+
+    def __len__(self):
+        return len(self.words)
+
+    def __getitem__(self, index):
+        return self.words[index]
+
+    def __iter__(self):
+        return iter(self.words)
+
+    def append_line(self, line):
+        """Add a '<word>' or '<word> - <meaning>' line and return its index, or None if blank."""
+        line = line.strip()
+        if not line:
+            return None
+        if self.binary:
+            self.materialize()
+            word, meaning = parse_word_line(line)
+            self.words.append((word, meaning))
+            self._meta.append((int(time.time()), FLAG_HAS_MEANING if meaning else 0))
+            if self.path:
+                self.compact()
+            return len(self.words) - 1
+        if self.path:
+            with instrument.stage("deck.append"), open(self.path, "a") as srcFile:
+                srcFile.write(("" if self._ends_with_newline else "\n") + line + "\n")
+            self._ends_with_newline = True
+        self.words.append(parse_word_line(line))
+        return len(self.words) - 1
+
+    def append_lines(self, lines):
+        """Add many word lines with a single write to the file; returns the range of their indexes."""
+        entries = [parse_word_line(line) for line in lines if line.strip()]
+        start = len(self.words)
+        if not entries:
+            return range(start, start)
+        if self.binary:
+            self.materialize()
+            added = int(time.time())
+            self.words.extend(entries)
+            self._meta.extend((added, FLAG_HAS_MEANING if meaning else 0) for _, meaning in entries)
+            if self.path:
+                self.compact()
+            return range(start, len(self.words))
+        if self.path:
+            with instrument.stage("deck.append"), open(self.path, "a") as srcFile:
+                srcFile.write(("" if self._ends_with_newline else "\n")
+                              + "".join(format_word_line(word, meaning) + "\n" for word, meaning in entries))
+            self._ends_with_newline = True
+        self.words.extend(entries)
+        return range(start, len(self.words))
+
+    def remove(self, index):
+        """Remove the entry at index and rewrite the file. Returns the removed (word, meaning)."""
+        self.materialize()
+        removed = self.words.pop(index)
+        if self._meta is not None:
+            self._meta.pop(index)
+        if self.path:
+            self.compact()
+        return removed
+
+    def compact(self):
+        """Atomically rewrite the file from the in-memory words."""
+        with instrument.stage("deck.compact"):
+            self._compact()
+
+    def _compact(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".words-", suffix=".tmp", dir=directory)
+        try:
+            if self.binary:
+                os.close(fd)
+                self.materialize()
+                write_binary_deck(tmp_path, (card + meta for card, meta in zip(self.words, self._meta)))
+            else:
+                with os.fdopen(fd, "w") as tmp:
+                    tmp.writelines(format_word_line(word, meaning) + "\n" for word, meaning in self.words)
+                    tmp.flush()
+                    os.fsync(tmp.fileno())
+            if os.path.exists(self.path):
+                os.chmod(tmp_path, os.stat(self.path).st_mode & 0o777)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._ends_with_newline = True
+
+
+class DeckLoader:
+    """
+    Reads a word source file on a worker thread so the window can show up
+    before a large deck is read.
+
+    deck.words grows as lines are parsed and may be read (not modified) from
+    other threads meanwhile. prepare, if given, is called with the finished
+    word list on the worker thread and its result kept in prepared.
+    """
+
+    def __init__(self, path, prepare=None):
+        self.deck = Deck(path)
+        self.prepare = prepare
+        self.prepared = None
+        self.error = None
+        if is_binary_deck(path):
+            # mapping a binary deck is O(1), so only prepare is left for the thread
+            try:
+                self.deck = Deck.load(path)
+            except Exception as e:
+                self.error = e
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="deck-loader", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        if self.error is not None:
+            self._done.set()
+            return
+        try:
+            if not self.deck.mapped:
+                with instrument.stage("deck.read"):
+                    append = self.deck.words.append
+                    for entry in read_words(self.deck.path):
+                        append(entry)
+                    self.deck._ends_with_newline = _ends_with_newline(self.deck.path)
+            if self.prepare is not None:
+                self.prepared = self.prepare(self.deck.words)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._done.set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
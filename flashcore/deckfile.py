@@ -0,0 +1,198 @@
+"""
+Binary deck files for very large vocabularies.
+
+Layout (little-endian), every section found through the header:
+
+    header    magic, version, offset width, card count and where each section starts
+    offsets   u32 or u64[2 * count + 1]  (u64 only when the blob passes 4 GB)
+                                  string i spans blob[offsets[i]:offsets[i + 1]];
+                                  card c has its word at 2c and meaning at 2c + 1
+    added     u32[count]          unix time the card entered the deck
+    flags     u8[count]           FLAG_* bits
+    order     u32[count]          card numbers sorted by normalized word
+    blob      UTF-8 strings
+
+MappedWords opens a file with mmap, so opening costs the same for any deck
+size and a card is only decoded when it is read. The sorted order lets the
+search index bisect words without reading the whole deck.
+"""
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import time
+from array import array
+
+from flashcore.cache import normalize_word
+
+MAGIC = b"FLDECK\x00\x01"
+VERSION = 1
+DECK_SUFFIX = ".fdeck"
+FLAG_HAS_MEANING = 0x01
+_HEADER = struct.Struct("<8sHHIQQQQQ")  # magic, version, offset width, count, then section positions
+_COPY_CHUNK = 1 << 20
+
+
+def is_binary_deck(path):
+    try:
+        with open(path, "rb") as file:
+            return file.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _typed(view, typecode):
+    # sections are little-endian; only big-endian machines pay for a converted copy
+    if sys.byteorder == "little":
+        return view.cast(typecode)
+    values = array(typecode, view.tobytes())
+    values.byteswap()
+    return values
+
+
+class MappedWords:
+    """Read-only sequence of (word, meaning) tuples backed by a memory-mapped binary deck."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # an empty file cannot be mapped
+            self._file.close()
+            raise ValueError(f"{path} is not a binary deck")
+        magic, version, width, count, offsets, added, flags, order, blob = _HEADER.unpack_from(self._map)
+        if magic != MAGIC or version != VERSION or width not in (4, 8):
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} binary deck")
+        view = memoryview(self._map)
+        self._count = count
+        self._offsets = _typed(view[offsets:offsets + width * (2 * count + 1)], "I" if width == 4 else "Q")
+        self._added = _typed(view[added:added + 4 * count], "I")
+        self._flags = view[flags:flags + count]
+        self.sorted_order = _typed(view[order:order + 4 * count], "I")
+        self._blob = blob
+        self._views = [view, self._offsets, self._added, self._flags, self.sorted_order]
+
+    def __len__(self):
+        return self._count
+
+    def _string(self, i):
+        start, end = self._offsets[i], self._offsets[i + 1]
+        return self._map[self._blob + start:self._blob + end].decode("utf-8")
+
+    def word(self, index):
+        return self._string(2 * self._card(index))
+
+    def meaning(self, index):
+        return self._string(2 * self._card(index) + 1)
+
+    def added(self, index):
+        return self._added[self._card(index)]
+
+    def flags(self, index):
+        return self._flags[self._card(index)]
+
+    def _card(self, index):
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("deck index out of range")
+        return index
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        card = self._card(index)
+        return self._string(2 * card), self._string(2 * card + 1)
+
+    def __iter__(self):
+        for card in range(self._count):
+            yield self._string(2 * card), self._string(2 * card + 1)
+
+    def close(self):
+        for view in getattr(self, "_views", ()):
+            if isinstance(view, memoryview):
+                view.release()
+        self._views = []
+        self._map.close()
+        self._file.close()
+
+
+def write_binary_deck(path, cards):
+    """
+    Write (word, meaning) or (word, meaning, added, flags) tuples as a binary deck.
+
+    The strings are streamed to a temporary file; only the offsets, metadata
+    and normalized words (for the sorted order) are kept in memory.
+    """
+    offsets = array("Q", [0])
+    added = array("I")
+    flags = bytearray()
+    keys = []
+    now = int(time.time())
+    directory = os.path.dirname(os.path.abspath(path))
+    with tempfile.TemporaryFile(dir=directory) as blob:
+        size = 0
+        for card in cards:
+            word, meaning = card[0], card[1]
+            for text in (word, meaning):
+                data = text.encode("utf-8")
+                blob.write(data)
+                size += len(data)
+                offsets.append(size)
+            added.append(card[2] if len(card) > 2 else now)
+            flags.append(card[3] if len(card) > 3 else (FLAG_HAS_MEANING if meaning else 0))
+            keys.append(normalize_word(word))
+        count = len(keys)
+        order = array("I", sorted(range(count), key=keys.__getitem__))
+        del keys
+        if size < 1 << 32:
+            offsets = array("I", offsets)
+        if sys.byteorder != "little":
+            for values in (offsets, added, order):
+                values.byteswap()
+
+        header_end = _HEADER.size
+        offsets_pos = header_end
+        added_pos = offsets_pos + offsets.itemsize * len(offsets)
+        flags_pos = added_pos + 4 * count
+        order_pos = (flags_pos + count + 3) & ~3
+        blob_pos = order_pos + 4 * count
+        with open(path, "wb") as out:
+            out.write(_HEADER.pack(MAGIC, VERSION, offsets.itemsize, count,
+                                   offsets_pos, added_pos, flags_pos, order_pos, blob_pos))
+            out.write(offsets.tobytes())
+            out.write(added.tobytes())
+            out.write(flags)
+            out.write(b"\0" * (order_pos - flags_pos - count))
+            out.write(order.tobytes())
+            blob.seek(0)
+            while True:
+                chunk = blob.read(_COPY_CHUNK)
+                if not chunk:
+                    break
+                out.write(chunk)
+            out.flush()
+            os.fsync(out.fileno())
+    return count
+
+
+def text_to_binary(src, dst):
+    """Convert a '<word> - <meaning>' word source file to a binary deck. Returns the card count."""
+    from flashcore.deck import read_words
+    return write_binary_deck(dst, read_words(src))
+
+
+def binary_to_text(src, dst):
+    """Convert a binary deck back to a word source file. Returns the card count."""
+    from flashcore.deck import format_word_line
+    words = MappedWords(src)
+    try:
+        with open(dst, "w") as out:
+            for word, meaning in words:
+                out.write(format_word_line(word, meaning) + "\n")
+        return len(words)
+    finally:
+        words.close()
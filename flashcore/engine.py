@@ -0,0 +1,236 @@
+import os
+import threading
+import time
+
+from flashcore import instrument
+from flashcore.cache import DefinitionCache, normalize_word
+from flashcore.config import config_file_path, load_config
+from flashcore.deck import Deck, DeckLoader
+from flashcore.lookup import LookupService
+from flashcore.scheduler import Scheduler
+from flashcore.search import DeckIndex
+from flashcore.session import StudySession
+from flashcore.transport import close_default_transport, configure_default_transport, default_transport
+
+
+class FlashcardEngine:
+    """
+    Everything the app does except drawing: deck, search index, lookups and
+    navigation. FlashcardApp is a view over one of these; the CLI and the
+    benchmarks use it without Tk.
+    """
+
+    def __init__(self, configJson, config_dir):
+        self.configJson = configJson
+        self.config_dir = config_dir
+        #per-stage timings, only collected when configs.json turns them on
+        self.instruments = instrument.from_config(configJson, config_dir)
+        #one pooled HTTP session shared by every dictionary lookup, opened on first use
+        configure_default_transport(configJson)
+        #persistent definition cache, kept next to configs.json
+        self.cache = DefinitionCache.from_config(configJson, config_dir)
+        #local dictionaries first, then LDOCE; failures fall back to the deck's own meanings
+        self.lookup = LookupService.from_config(self.cache, configJson, config_dir)
+        self.deck = Deck()
+        self.index = DeckIndex()
+        self.session = StudySession(self.deck)
+        self._loader = None
+        #spaced repetition; the review history is only read once it is needed
+        self._scheduler = None
+        self._scheduler_lock = threading.Lock()
+        self._new_cursor = 0  # deck position from which never-graded cards are introduced
+
+    @classmethod
+    def from_config_file(cls, path=None):
+        path = path or config_file_path()
+        configJson = load_config(path) if os.path.exists(path) else {}
+        return cls(configJson, os.path.dirname(os.path.abspath(path)))
+
+    @property
+    def transport(self):
+        return default_transport()
+
+    @property
+    def words(self):
+        return self.deck.words
+
+    @property
+    def loading(self):
+        return self._loader is not None
+
+    @property
+    def scheduler(self):
+        with self._scheduler_lock:
+            if self._scheduler is None:
+                self._scheduler = Scheduler.from_config(self.configJson, self.config_dir)
+            return self._scheduler
+
+    def load_deck(self, path):
+        """Load a word source file. Raises OSError if it cannot be read."""
+        self.set_deck(Deck.load(path))
+
+    def start_loading(self, path):
+        """
+        Load a word source file on a worker thread. self.words fills in as the
+        file is read; call finish_loading() once loader.done to install the
+        search index, which is built on the same thread.
+        """
+        self.finish_loading(discard=True)
+        self._loader = DeckLoader(path, prepare=DeckIndex.for_words)
+        self.deck.close()
+        self.deck = self._loader.deck
+        self.index = DeckIndex()
+        self.session.set_deck(self.deck)
+        self._new_cursor = 0
+        return self._loader
+
+    def finish_loading(self, discard=False):
+        """Wait for a background load. Raises its error (leaving an empty deck) unless discard."""
+        loader, self._loader = self._loader, None
+        if loader is None:
+            return
+        loader.wait()
+        if loader.error is not None:
+            self.set_deck(Deck())
+            if not discard:
+                raise loader.error
+            return
+        self.index = loader.prepared
+        self.session.set_deck(self.deck)
+
+    def set_deck(self, deck):
+        if deck is not self.deck:
+            self.deck.close()
+        self.deck = deck
+        self.index = DeckIndex.for_words(deck.words)
+        self.session.set_deck(deck)
+        self._new_cursor = 0
+
+    def _editable(self):
+        # a memory-mapped deck is copied into a list before its first edit
+        self.finish_loading()
+        if self.deck.mapped:
+            self.deck.materialize()
+            self.index = DeckIndex(self.deck.words)
+
+    def add_word(self, line):
+        """Append a '<word>' or '<word> - <meaning>' line; returns its index or None if blank."""
+        self._editable()
+        index = self.deck.append_line(line)
+        if index is not None:
+            self.index.add(index, self.deck[index][0])
+            if self._scheduler is not None:
+                # a word graded before it was removed picks up where it left off
+                self._scheduler.requeue(normalize_word(self.deck[index][0]))
+        return index
+
+    def add_words(self, lines):
+        """Append many word lines in one write, skipping words already in the deck; returns their indexes."""
+        self._editable()
+        fresh, seen = [], set()
+        for line in lines:
+            key = normalize_word(line.split(" - ", 1)[0])
+            if key and key not in seen and not len(self.index.positions_of(key)):
+                seen.add(key)
+                fresh.append(line)
+        added = self.deck.append_lines(fresh)
+        for index in added:
+            self.index.add(index, self.deck[index][0])
+            if self._scheduler is not None:
+                self._scheduler.requeue(normalize_word(self.deck[index][0]))
+        return added
+
+    def known_words(self):
+        """The deck's words, normalized, for deciding what is new to it."""
+        self.finish_loading()
+        return {normalize_word(word) for word, _ in self.deck.words}
+
+    def remove_word(self, index):
+        self._editable()
+        removed = self.deck.remove(index)
+        self.index.remove(index)
+        self.session.removed(index)
+        if index < self._new_cursor:
+            self._new_cursor -= 1
+        return removed
+
+    def next_card(self, now=None):
+        """
+        Deck position of the card to study next: the most overdue graded card,
+        else a new card while today's allowance lasts. None if nothing is due.
+        """
+        self.finish_loading()
+        scheduler = self.scheduler
+        now = time.time() if now is None else now
+        while True:
+            word = scheduler.peek_due(now)
+            if word is None:
+                break
+            positions = self.index.positions_of(word)
+            if len(positions):
+                return positions[0]
+            scheduler.skip(word)  # graded in another deck
+        if scheduler.new_cards_left(now) <= 0:
+            return None
+        while self._new_cursor < len(self.deck):
+            pos = self._new_cursor
+            self._new_cursor += 1
+            if not scheduler.known(normalize_word(self.deck[pos][0])):
+                return pos
+        return None
+
+    def review(self, grade, now=None):
+        """Grade the current card (a flashcore.scheduler grade) and return the next card's position or None."""
+        word = self.session.current_word
+        if word:
+            self.scheduler.review(normalize_word(word), grade, now)
+        return self.next_card(now)
+
+    def search(self, query, limit=1000):
+        """Deck positions matching query, including words whose cached definition matches."""
+        definition_words = self.cache.search_words(query) if len(query.strip()) >= 3 else ()
+        return self.index.search(query, limit=limit, definition_words=definition_words)
+
+    def inline_meaning(self, word):
+        """The meaning written next to word in the word file, or ''."""
+        key = normalize_word(word)
+        # the index is empty while a deck loads; the current card is still known
+        positions = list(self.index.positions_of(key)) + [self.session.current_index]
+        try:
+            for pos in positions:
+                card_word, meaning = self.deck[pos]
+                if meaning and normalize_word(card_word) == key:
+                    return meaning
+        except IndexError:  # the deck changed under a worker thread's lookup
+            pass
+        return ""
+
+    def local_card(self, word):
+        """word's card if it can be shown without waiting on the network, else None."""
+        return self.lookup.local(word, self.inline_meaning(word))
+
+    def define(self, word):
+        return self.lookup.define(word, self.inline_meaning(word))
+
+    def define_with_source(self, word):
+        """(card, source) for word; see LookupService.define_with_source."""
+        return self.lookup.define_with_source(word, self.inline_meaning(word))
+
+    def close(self):
+        try:
+            self.finish_loading(discard=True)
+            # waits for a scheduler still being opened on another thread, so its snapshot is written too
+            with self._scheduler_lock:
+                if self._scheduler is not None:
+                    self._scheduler.close()
+            self.deck.close()
+            self.lookup.close()
+            self.cache.close()
+            close_default_transport()
+        finally:
+            # the trace is most wanted when something above went wrong
+            if self.instruments is not None:
+                trace_path = self.configJson.get("trace_export_path")
+                if trace_path:
+                    self.instruments.export_chrome_trace(os.path.join(self.config_dir, os.path.expanduser(trace_path)))
+                instrument.disable()
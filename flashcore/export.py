@@ -0,0 +1,128 @@
+"""
+Streaming deck export to CSV, TSV or an Anki import file.
+
+Cards are read one at a time from the deck (or a word source file) and
+their definitions come from the local dictionaries and the cache; missing
+ones are looked up on the network only when fetch is on, a few at a time on
+a thread pool. Rows are written as soon as they are ready and in deck
+order, so memory stays flat whatever the size of the deck.
+
+The Anki format is a tab-separated file with Anki's header lines
+(separator, html, notetype, deck), which File > Import understands.
+"""
+import csv
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from flashcore.cache import card_text
+
+FORMATS = ("csv", "tsv", "anki")
+EXTENSIONS = {".csv": "csv", ".tsv": "tsv", ".txt": "anki"}
+
+
+def format_for_path(path):
+    """The export format a file name asks for, by extension (csv when unsure)."""
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower(), "csv")
+
+
+class ExportStats:
+    def __init__(self, total=None):
+        self.total = total
+        self.cached = 0
+        self.fetched = 0
+        self.missing = 0
+        self.started = time.monotonic()
+        self.finished = None
+
+    @property
+    def done(self):
+        return self.cached + self.fetched + self.missing
+
+    def report(self):
+        elapsed = (self.finished or time.monotonic()) - self.started
+        rate = self.done / elapsed if elapsed else 0.0
+        total = f"/{self.total}" if self.total is not None else ""
+        return (f"{self.done}{total} cards  {rate:.0f} cards/s  "
+                f"cached={self.cached} fetched={self.fetched} missing={self.missing}")
+
+
+class DeckExporter:
+
+    def __init__(self, lookup, fetch=False, workers=4, plain=False, progress=print, progress_interval=2.0):
+        self.lookup = lookup
+        self.fetch = fetch
+        self.workers = workers
+        self.plain = plain
+        self.progress = progress
+        self.progress_interval = progress_interval
+        self.stats = ExportStats()
+
+    def _card(self, word):
+        card = self.lookup.offline(word)
+        if card is not None:
+            return card, "cached"
+        if self.fetch:
+            self.lookup.define(word)
+            # only a real definition counts, not the fallback card a failed lookup gives
+            card = self.lookup.offline(word)
+            if card is not None:
+                return card, "fetched"
+        return "", "missing"
+
+    def cards(self, words):
+        """Yield (word, meaning, card) for (word, meaning) pairs, in order; card is '' if there is none."""
+        if not self.fetch or self.workers <= 1:
+            for word, meaning in words:
+                yield (word, meaning) + self._counted(self._card(word))
+            return
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="export") as pool:
+            # a bounded window of lookups in flight keeps rows in order without reading ahead
+            window = deque()
+            for word, meaning in words:
+                window.append((word, meaning, pool.submit(self._card, word)))
+                if len(window) >= self.workers * 4:
+                    word, meaning, future = window.popleft()
+                    yield (word, meaning) + self._counted(future.result())
+            while window:
+                word, meaning, future = window.popleft()
+                yield (word, meaning) + self._counted(future.result())
+
+    def _counted(self, result):
+        card, source = result
+        if source == "cached":
+            self.stats.cached += 1
+        elif source == "fetched":
+            self.stats.fetched += 1
+        else:
+            self.stats.missing += 1
+        return (card_text(card) if self.plain and card else card,)
+
+    def export(self, words, path, fmt=None, deck_name=None, total=None):
+        """Write every card of words to path and return the ExportStats."""
+        fmt = fmt or format_for_path(path)
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown export format {fmt!r}")
+        self.stats = stats = ExportStats(total)
+        last_report = time.monotonic()
+        with open(path, "w", encoding="utf-8", newline="") as out:
+            writer = csv.writer(out, delimiter="," if fmt == "csv" else "\t", lineterminator="\n")
+            if fmt == "anki":
+                out.write("#separator:tab\n#html:{}\n#notetype:Basic\n".format("false" if self.plain else "true"))
+                if deck_name:
+                    out.write(f"#deck:{deck_name}\n")
+                out.write("#columns:Front\tBack\n")
+            else:
+                writer.writerow(("word", "meaning", "definition"))
+            for word, meaning, card in self.cards(words):
+                if fmt == "anki":
+                    writer.writerow((word, card or meaning))
+                else:
+                    writer.writerow((word, meaning, card))
+                if time.monotonic() - last_report >= self.progress_interval:
+                    last_report = time.monotonic()
+                    self.progress(stats.report())
+        stats.finished = time.monotonic()
+        self.progress(stats.report())
+        return stats
@@ -0,0 +1,118 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from flashcore.cache import normalize_word
+
+
+class DefinitionFetcher:
+    """
+    Runs definition lookups on a small thread pool so the Tk thread never blocks.
+
+    Results are queued and handed back by deliver(), which the UI calls from
+    root.after. Only the most recent fetch() is delivered; older ones are
+    cancelled if they have not started yet, or dropped when they finish.
+    Concurrent requests for the same word share one lookup.
+
+    Prefetches run on a separate, smaller pool so they never delay the card
+    the user is waiting for. Once nothing has been requested for
+    idle_seconds, words handed to prefetch_idle() are warmed a few at a time.
+    """
+
+    def __init__(self, lookup, max_workers=2, prefetch_workers=2, idle_seconds=5):
+        self._lookup = lookup
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fetch")
+        self._prefetcher = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix="prefetch")
+        self._prefetch_workers = prefetch_workers
+        self._idle_seconds = idle_seconds
+        self._lock = threading.RLock()
+        self._inflight = {}
+        self._done = queue.SimpleQueue()
+        self._generation = 0
+        self._latest = None
+        self._last_fetch = time.monotonic()
+        self._window = {}
+        self._idle_words = None
+        self._idle_pending = []
+
+    def submit(self, word, executor=None):
+        """Start (or join) a lookup for word and return its Future."""
+        key = normalize_word(word)
+        with self._lock:
+            future = self._inflight.get(key)
+            # a foreground request steals a prefetch that is still queued
+            if future is not None and not (executor is None and future.cancel()):
+                return future
+            future = (executor or self._executor).submit(self._lookup, word)
+            self._inflight[key] = future
+        future.add_done_callback(lambda f: self._forget(key, f))
+        return future
+
+    def fetch(self, word, callback):
+        """Look up word and call callback(word, html) on the UI thread, superseding earlier fetches."""
+        self._generation += 1
+        self._last_fetch = time.monotonic()
+        generation = self._generation
+        future = self.submit(word)
+        if self._latest is not None and self._latest is not future:
+            self._latest.cancel()
+        self._latest = future
+        future.add_done_callback(lambda f: self._done.put((generation, word, callback, f)))
+        return future
+
+    def prefetch(self, words):
+        """Warm lookups for words, cancelling queued prefetches that fell out of the window."""
+        wanted = {}
+        for word in words:
+            wanted.setdefault(normalize_word(word), word)
+        for key, future in self._window.items():
+            if key not in wanted and future is not self._latest:
+                future.cancel()
+        self._window = {key: self.submit(word, self._prefetcher) for key, word in wanted.items()}
+
+    def prefetch_idle(self, words):
+        """Warm every word in the iterable, but only while the user is idle."""
+        self._idle_words = iter(words)
+        self._idle_pending = []
+
+    def _top_up_idle(self):
+        if self._idle_words is None:
+            return
+        if time.monotonic() - self._last_fetch < self._idle_seconds:
+            return
+        if any(not f.done() for f in self._window.values()):
+            return
+        self._idle_pending = [f for f in self._idle_pending if not f.done()]
+        while len(self._idle_pending) < self._prefetch_workers:
+            word = next(self._idle_words, None)
+            if word is None:
+                self._idle_words = None
+                return
+            self._idle_pending.append(self.submit(word, self._prefetcher))
+
+    def deliver(self):
+        """Run callbacks for finished fetches. Must be called from the UI thread."""
+        self._top_up_idle()
+        while True:
+            try:
+                generation, word, callback, future = self._done.get_nowait()
+            except queue.Empty:
+                return
+            if generation != self._generation or future.cancelled():
+                continue
+            try:
+                html = future.result()
+            except Exception as e:
+                html = f"Failed to retrieve the page. Error: {e}"
+            callback(word, html)
+
+    def shutdown(self):
+        self._idle_words = None
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._prefetcher.shutdown(wait=False, cancel_futures=True)
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
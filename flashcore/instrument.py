@@ -0,0 +1,254 @@
+"""
+Per-stage timings and counters for the lookup and display path.
+
+Code on the hot path wraps each stage in `with instrument.stage("parse", word):`
+and bumps counters with instrument.count("cache.hit"). While instrumentation
+is off (the default) stage() hands back a shared no-op context manager and
+count() returns at once, so the calls cost next to nothing.
+
+When it is on, every stage is kept in a bounded event buffer that can be
+written out as Chrome trace-event JSON (chrome://tracing, Perfetto) and,
+optionally, appended to a CSV file that rolls over at a size limit. Stages
+are grouped by word so a card's breakdown (network, parse, format, render)
+and running percentiles can be shown in the status bar.
+"""
+import json
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+
+WINDOW = 500          # samples kept per stage for the running percentiles
+MAX_EVENTS = 100_000  # events kept for the trace export
+MAX_CARDS = 200       # words whose stage breakdown is remembered
+CSV_MAX_BYTES = 1_000_000
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _NullStage()
+
+
+class _Stage:
+    __slots__ = ('instruments', 'name', 'word', 'start')
+
+    def __init__(self, instruments, name, word):
+        self.instruments = instruments
+        self.name = name
+        self.word = word
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.instruments.record(self.name, self.word, self.start, time.perf_counter())
+        return False
+
+
+def _percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+class Instruments:
+
+    def __init__(self, window=WINDOW, max_events=MAX_EVENTS):
+        self.start = time.perf_counter()
+        self.counters = Counter()
+        self.last_card = None  # (word, total_ms, {stage: ms})
+        self._window = window
+        self._samples = {}     # stage -> deque of recent durations in ms
+        self._events = deque(maxlen=max_events)
+        self._cards = OrderedDict()  # word -> {"start": t or None, "stages": {stage: ms}}
+        self._csv = None
+        self._csv_path = None
+        self._csv_max_bytes = CSV_MAX_BYTES
+        self._lock = threading.Lock()
+
+    def stage(self, name, word=None):
+        return _Stage(self, name, word)
+
+    def record(self, name, word, start, end):
+        ms = (end - start) * 1000
+        thread = threading.get_ident()
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self._window)
+            samples.append(ms)
+            self._events.append((name, word, start, end, thread))
+            if word is not None:
+                card = self._card(word)
+                card["stages"][name] = card["stages"].get(name, 0.0) + ms
+            if self._csv is not None:
+                self._write_csv(name, word, start, ms, thread)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] += n
+
+    def _card(self, word):
+        card = self._cards.get(word)
+        if card is None:
+            card = self._cards[word] = {"start": None, "stages": {}}
+            if len(self._cards) > MAX_CARDS:
+                self._cards.popitem(last=False)
+        else:
+            self._cards.move_to_end(word)
+        return card
+
+    def card_started(self, word):
+        """The user asked for word's card; stages recorded for it from now on make up its breakdown."""
+        with self._lock:
+            self._cards.pop(word, None)
+            self._card(word)["start"] = time.perf_counter()
+
+    def card_finished(self, word):
+        """word's card is on screen. Returns its total time in ms, or None if it was not started."""
+        end = time.perf_counter()
+        with self._lock:
+            card = self._cards.get(word)
+            if card is None or card["start"] is None:
+                return None
+            total = (end - card["start"]) * 1000
+            card["start"] = None
+            self.last_card = (word, total, dict(card["stages"]))
+        self.record("card", None, end - total / 1000, end)
+        return total
+
+    def percentiles(self, name):
+        """(p50, p95, p99) in ms over the recent samples of a stage, or None."""
+        with self._lock:
+            samples = sorted(self._samples.get(name, ()))
+        if not samples:
+            return None
+        return tuple(_percentile(samples, p) for p in (50, 95, 99))
+
+    def summary(self):
+        """One line for the status bar: the last card's breakdown, card percentiles and cache counters."""
+        parts = []
+        if self.last_card is not None:
+            word, total, stages = self.last_card
+            breakdown = " ".join(f"{name} {ms:.0f}" for name, ms in stages.items())
+            parts.append(f"{word}: {total:.0f} ms ({breakdown})" if breakdown else f"{word}: {total:.0f} ms")
+        card = self.percentiles("card")
+        if card is not None:
+            parts.append("cards p50 {:.0f} / p95 {:.0f} / p99 {:.0f} ms".format(*card))
+        hits, misses = self.counters["cache.hit"], self.counters["cache.miss"]
+        if hits or misses:
+            parts.append(f"cache {hits} hit / {misses} miss")
+        return "   |   ".join(parts)
+
+    def chrome_trace(self):
+        """The recorded stages and counters as a Chrome trace-event document."""
+        pid = os.getpid()
+        with self._lock:
+            events = list(self._events)
+            counters = dict(self.counters)
+        trace = [{"name": name, "cat": name.split(".")[0], "ph": "X", "pid": pid, "tid": thread,
+                  "ts": (start - self.start) * 1e6, "dur": (end - start) * 1e6,
+                  "args": {"word": word} if word is not None else {}}
+                 for name, word, start, end, thread in events]
+        if counters:
+            trace.append({"name": "counters", "ph": "C", "pid": pid, "tid": 0,
+                          "ts": (time.perf_counter() - self.start) * 1e6, "args": counters})
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path):
+        with open(path, "w") as trace_file:
+            json.dump(self.chrome_trace(), trace_file)
+
+    def open_csv(self, path, max_bytes=CSV_MAX_BYTES):
+        """Append every stage to a CSV file; it is moved to path + '.1' once it grows past max_bytes."""
+        with self._lock:
+            self._csv_path = path
+            self._csv_max_bytes = max_bytes
+            self._open_csv()
+
+    def _open_csv(self):
+        new = not os.path.exists(self._csv_path) or os.path.getsize(self._csv_path) == 0
+        self._csv = open(self._csv_path, "a", buffering=1)
+        if new:
+            self._csv.write("unix_time,stage,word,ms,thread\n")
+
+    def _write_csv(self, name, word, start, ms, thread):
+        wall = time.time() - (time.perf_counter() - start)
+        word = "" if word is None else '"%s"' % word.replace('"', '""')
+        self._csv.write(f"{wall:.3f},{name},{word},{ms:.3f},{thread}\n")
+        if self._csv.tell() > self._csv_max_bytes:
+            self._csv.close()
+            os.replace(self._csv_path, self._csv_path + ".1")
+            self._open_csv()
+
+    def close(self):
+        with self._lock:
+            if self._csv is not None:
+                self._csv.close()
+                self._csv = None
+
+
+_active = None
+
+
+def active():
+    """The running Instruments, or None while instrumentation is off."""
+    return _active
+
+
+def enable(instruments=None):
+    global _active
+    _active = instruments or Instruments()
+    return _active
+
+
+def disable():
+    global _active
+    previous, _active = _active, None
+    if previous is not None:
+        previous.close()
+
+
+def from_config(configJson, config_dir):
+    """Turn instrumentation on if configJson asks for it (or for the status bar); returns it or None."""
+    if not (configJson.get("instrumentation") or configJson.get("status_bar")):
+        return None
+    instruments = enable()
+    csv_path = configJson.get("timings_csv_path")
+    if csv_path:
+        instruments.open_csv(os.path.join(config_dir, os.path.expanduser(csv_path)),
+                             configJson.get("timings_csv_max_kb", CSV_MAX_BYTES // 1000) * 1000)
+    return instruments
+
+
+def stage(name, word=None):
+    instruments = _active
+    if instruments is None:
+        return _NULL
+    return instruments.stage(name, word)
+
+
+def count(name, n=1):
+    instruments = _active
+    if instruments is not None:
+        instruments.count(name, n)
+
+
+def card_started(word):
+    instruments = _active
+    if instruments is not None:
+        instruments.card_started(word)
+
+
+def card_finished(word):
+    instruments = _active
+    if instruments is not None:
+        return instruments.card_finished(word)
+    return None
@@ -0,0 +1,193 @@
+"""
+Single-pass extraction of LDOCE dictionary entries.
+
+Only the first ldoceEntry subtree of a page is turned into a tree (via a
+SoupStrainer, after skipping everything before it), and the card is built from one
+recursive walk over that subtree instead of a find/find_all per field.
+"""
+BeautifulSoup = SoupStrainer = Tag = None
+
+ENTRY_CLASS = 'ldoceEntry'
+MEANING_NOT_FOUND = "Meaning not found."
+_HEADER_FIELDS = ('HWD', 'HYPHENATION', 'PRON', 'POS', 'GRAM')
+_SENSE_FIELDS = ('sensenum', 'REGISTERLAB', 'ACTIV', 'DEF', 'RELATEDWD', 'EXAMPLE')
+
+
+def _load_bs4():
+    # bs4 is imported when the first page is parsed rather than at app startup
+    global BeautifulSoup, SoupStrainer, Tag
+    if Tag is None:
+        from bs4 import BeautifulSoup, SoupStrainer, Tag
+
+
+def _is_entry_class(value):
+    # while parsing, the strainer sees the raw attribute string ("ldoceEntry Entry")
+    if value is None:
+        return False
+    return ENTRY_CLASS in (value.split() if isinstance(value, str) else value)
+
+
+def _first_entry_strainer():
+    # later entries on the page (other parts of speech) are skipped as well
+    matched = []
+
+    def match(value):
+        if matched or not _is_entry_class(value):
+            return False
+        matched.append(value)
+        return True
+    return SoupStrainer(class_=match)
+
+
+def decode_page(response):
+    """Decode a page response, defaulting to UTF-8 rather than requests' ISO-8859-1 guess."""
+    content_type = response.headers.get('Content-Type', '').lower()
+    encoding = response.encoding if 'charset' in content_type and response.encoding else 'utf-8'
+    return response.content.decode(encoding, errors='replace')
+
+
+def extract_entry(page):
+    """Return the first ldoceEntry element of a dictionary page (str or bytes), or None."""
+    if isinstance(page, bytes):
+        page = page.decode('utf-8', errors='replace')
+    _load_bs4()
+    # everything before the entry (head, scripts, navigation) never needs a tree
+    start = page.find(ENTRY_CLASS)
+    if start != -1:
+        start = page.rfind('<', 0, start)
+    entry = None
+    if start != -1:
+        entry = BeautifulSoup(page[start:], 'html.parser', parse_only=_first_entry_strainer()).find(class_=ENTRY_CLASS)
+    if entry is None:
+        entry = BeautifulSoup(page, 'html.parser', parse_only=_first_entry_strainer()).find(class_=ENTRY_CLASS)
+    return entry
+
+
+def _strict_text(tag):
+    return tag.get_text(strip=True) if tag is not None else None
+
+
+def _loose_text(tag):
+    # the old formatter read these fields from prettify() output, which puts every
+    # string on its own line; keeping the surrounding spaces renders identically
+    if tag is None:
+        return ''
+    text = ' '.join(tag.stripped_strings)
+    return f' {text} ' if text else ' '
+
+
+class _Sense:
+    __slots__ = ('fields', 'gram_exas')
+
+    def __init__(self):
+        self.fields = {}
+        self.gram_exas = []
+
+
+class _EntryWalk:
+    """Collects the first header fields, topics and every Sense in one walk."""
+
+    def __init__(self):
+        self.header = {}
+        self.topics = None
+        self.related = None
+        self.topic = None
+        self.senses = []
+        self._open_senses = []
+        self._open_gram_exas = []
+        self._in_topics = False
+
+    def walk(self, node):
+        for child in node.children:
+            if not isinstance(child, Tag):
+                continue
+            classes = child.get('class') or ()
+            sense = gram_exa = None
+            entered_topics = False
+            if classes:
+                # fields are only searched below a Sense/GramExa, so collect before opening one
+                self._collect(child, classes)
+                if child.name == 'span':
+                    if 'GramExa' in classes:
+                        gram_exa = [None]
+                        for open_sense in self._open_senses:
+                            open_sense.gram_exas.append(gram_exa)
+                    if 'Sense' in classes:
+                        sense = _Sense()
+                        self.senses.append(sense)
+                        self._open_senses.append(sense)
+                    if gram_exa is not None:
+                        self._open_gram_exas.append(gram_exa)
+                    if self.topics is None and 'topics_container' in classes:
+                        self.topics = child
+                        self._in_topics = entered_topics = True
+            self.walk(child)
+            if sense is not None:
+                self._open_senses.pop()
+            if gram_exa is not None:
+                self._open_gram_exas.pop()
+            if entered_topics:
+                self._in_topics = False
+
+    def _collect(self, tag, classes):
+        if self._in_topics:
+            if self.related is None and tag.name == 'span' and 'related_topics' in classes:
+                self.related = tag
+            if self.topic is None and tag.name == 'a' and 'topic' in classes:
+                self.topic = tag
+        if tag.name != 'span':
+            return
+        for name in _HEADER_FIELDS:
+            if name in classes and name not in self.header:
+                self.header[name] = tag
+        for name in _SENSE_FIELDS:
+            if name in classes:
+                for open_sense in self._open_senses:
+                    open_sense.fields.setdefault(name, tag)
+        if 'EXAMPLE' in classes:
+            for gram_exa in self._open_gram_exas:
+                if gram_exa[0] is None:
+                    gram_exa[0] = tag
+
+
+def format_entry(entry):
+    """Build the card HTML for an ldoceEntry element."""
+    _load_bs4()
+    state = _EntryWalk()
+    state.walk(entry)
+
+    header = {name: _strict_text(state.header.get(name)) for name in _HEADER_FIELDS}
+    parts = [
+        f'<p>{_strict_text(state.related)}: {_strict_text(state.topic)}<br />'
+        f'<span style="color: #ff0000;"><strong>{header["HWD"]}</strong></span> {header["HYPHENATION"]} '
+        f'<span style="color: #ff6600;">/ {header["PRON"]} /</span> '
+        f'<span style="color: #339966;"><strong> {header["POS"]}</strong></span> {header["GRAM"]}</p>'
+    ]
+    for sense in state.senses:
+        fields = sense.fields
+        sense_content = f'<p>{_strict_text(fields.get("sensenum"))}. '
+        registerlab = _strict_text(fields.get('REGISTERLAB'))
+        if registerlab:
+            sense_content += f'<span style="color: #333399;"><em>{registerlab}</em></span> '
+        activ = _strict_text(fields.get('ACTIV'))
+        if activ:
+            sense_content += f'<span style="color: #333399;"><em>{activ}</em></span> '
+        relatedwd = _strict_text(fields.get('RELATEDWD')) or ''
+        sense_content += f'{_loose_text(fields.get("DEF"))} {relatedwd}<br />'
+        example = _loose_text(fields.get('EXAMPLE'))
+        if example:
+            sense_content += f'<span style="color: #808080;"><em>&nbsp;&nbsp;{example}</em></span><br />'
+        for (gram_example,) in sense.gram_exas:
+            if gram_example is not None:
+                sense_content += f'<span style="color: #808080;"><em>&nbsp;&nbsp;{_strict_text(gram_example)}</em></span><br />'
+        parts.append(sense_content + '</p>')
+    return ''.join(parts)
+
+
+def format_html(html_content):
+    """Build the card HTML from an ldoceEntry HTML string (e.g. a cached raw entry)."""
+    entry = extract_entry(html_content)
+    if entry is None:
+        # not an entry at all (e.g. an error message): format an empty card around it
+        return format_entry(BeautifulSoup(html_content, 'html.parser'))
+    return format_entry(entry)
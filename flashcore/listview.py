@@ -0,0 +1,169 @@
+"""
+A Listbox look-alike that only materializes the rows currently on screen.
+
+The items are any sequence (e.g. the deck's word list); rows are formatted on
+demand, so loading, adding or removing words costs O(visible rows) widget
+work instead of one Listbox.insert per word.
+"""
+import tkinter as tk
+import tkinter.font as tkfont
+
+OVERSCAN_ROWS = 2  # extra rows below the viewport so a partly visible row is never blank
+
+
+def numbered_row(index, item):
+    word, _ = item
+    return f"{index + 1}. {word}"
+
+
+class VirtualListbox(tk.Frame):
+    """
+    Drop-in replacement for the parts of tk.Listbox the app uses.
+
+    curselection(), yview(), yview_moveto(), see(), selection_set() and the
+    <<ListboxSelect>> event all work in absolute item indexes/fractions, and
+    yscrollcommand can be connected to a regular tk.Scrollbar.
+    """
+
+    def __init__(self, master, items=(), format_row=numbered_row, font=None, height=15, **kwargs):
+        super().__init__(master)
+        self._items = items
+        self._format_row = format_row
+        self._first = 0
+        self._visible = height
+        self._selected = None
+        self._yscrollcommand = None
+        self._listbox = tk.Listbox(self, font=font, height=height, exportselection=False,
+                                   activestyle="none", **kwargs)
+        self._listbox.pack(fill=tk.BOTH, expand=True)
+        self._row_height = tkfont.Font(font=self._listbox.cget("font")).metrics("linespace") + 1
+
+        self._listbox.bind("<<ListboxSelect>>", self._on_listbox_select)
+        self._listbox.bind("<Configure>", self._on_resize)
+        self._listbox.bind("<MouseWheel>", self._on_mousewheel)
+        self._listbox.bind("<Button-4>", lambda e: self._scroll_rows(-3))
+        self._listbox.bind("<Button-5>", lambda e: self._scroll_rows(3))
+        self._listbox.bind("<Up>", lambda e: self._move_selection(-1))
+        self._listbox.bind("<Down>", lambda e: self._move_selection(1))
+        self._listbox.bind("<Prior>", lambda e: self._scroll_rows(-self._visible))
+        self._listbox.bind("<Next>", lambda e: self._scroll_rows(self._visible))
+
+    # -- model ---------------------------------------------------------------
+
+    def set_items(self, items, format_row=None):
+        """Show a new sequence of items, keeping the scroll position if possible."""
+        self._items = items
+        if format_row is not None:
+            self._format_row = format_row
+        if self._selected is not None and self._selected >= len(items):
+            self._selected = None
+        self.refresh()
+
+    def refresh(self):
+        """Redraw the visible rows after the items changed."""
+        self._first = max(0, min(self._first, self._max_first()))
+        count = min(self._visible + OVERSCAN_ROWS, len(self._items) - self._first)
+        self._listbox.delete(0, tk.END)
+        if count > 0:
+            self._listbox.insert(tk.END, *(self._format_row(i, self._items[i])
+                                           for i in range(self._first, self._first + count)))
+        if self._selected is not None and self._first <= self._selected < self._first + count:
+            self._listbox.selection_set(self._selected - self._first)
+        self._update_scrollbar()
+
+    # -- Listbox compatible API ----------------------------------------------
+
+    def curselection(self):
+        return () if self._selected is None else (self._selected,)
+
+    def selection_set(self, index):
+        self._selected = index
+        self.refresh()
+
+    def selection_clear(self, *args):
+        self._selected = None
+        self._listbox.selection_clear(0, tk.END)
+
+    def see(self, index):
+        if index < self._first:
+            self._first = index
+        elif index >= self._first + self._visible:
+            self._first = index - self._visible + 1
+        else:
+            return
+        self.refresh()
+
+    def size(self):
+        return len(self._items)
+
+    def yview(self, *args):
+        """With no arguments return (first, last) fractions, otherwise scroll like Listbox.yview."""
+        if not args:
+            total = len(self._items)
+            if not total:
+                return (0.0, 1.0)
+            return (self._first / total, min(1.0, (self._first + self._visible) / total))
+        if args[0] == "moveto":
+            return self.yview_moveto(float(args[1]))
+        if args[0] == "scroll":
+            amount, what = int(args[1]), args[2]
+            self._scroll_rows(amount * (self._visible if what == "pages" else 1))
+
+    def yview_moveto(self, fraction):
+        self._first = int(round(float(fraction) * len(self._items)))
+        self.refresh()
+
+    def configure(self, cnf=None, **kwargs):
+        if "yscrollcommand" in kwargs:
+            self._yscrollcommand = kwargs.pop("yscrollcommand")
+            self._update_scrollbar()
+        if cnf or kwargs:
+            return self._listbox.configure(cnf, **kwargs)
+
+    config = configure
+
+    # -- internals -------------------------------------------------------------
+
+    def _max_first(self):
+        return max(0, len(self._items) - self._visible)
+
+    def _update_scrollbar(self):
+        if self._yscrollcommand:
+            first, last = self.yview()
+            self._yscrollcommand(first, last)
+
+    def _scroll_rows(self, rows):
+        first = max(0, min(self._first + rows, self._max_first()))
+        if first != self._first:
+            self._first = first
+            self.refresh()
+        return "break"
+
+    def _move_selection(self, step):
+        if not len(self._items):
+            return "break"
+        current = self._first if self._selected is None else self._selected + step
+        self._selected = max(0, min(current, len(self._items) - 1))
+        self.see(self._selected)
+        self.refresh()
+        self.event_generate("<<ListboxSelect>>")
+        return "break"
+
+    def _on_mousewheel(self, event):
+        return self._scroll_rows(-1 if event.delta > 0 else 1)
+
+    def _on_resize(self, event):
+        first_row, second_row = self._listbox.bbox(0), self._listbox.bbox(1)
+        if first_row and second_row:
+            self._row_height = max(1, second_row[1] - first_row[1])
+        visible = max(1, event.height // self._row_height)
+        if visible != self._visible:
+            self._visible = visible
+            self.refresh()
+
+    def _on_listbox_select(self, event):
+        rows = self._listbox.curselection()
+        if not rows:
+            return
+        self._selected = self._first + rows[0]
+        self.event_generate("<<ListboxSelect>>")
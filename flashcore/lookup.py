@@ -0,0 +1,205 @@
+import html
+
+from flashcore import backends, instrument, ldoce_parser
+from flashcore.breaker import CircuitBreaker
+from flashcore.transport import RETRY_STATUSES, default_transport
+
+OFFLINE_MESSAGE = "Dictionary unreachable, showing the meaning from your word file."
+
+
+def failed_message(status_code):
+    return f"Failed to retrieve the page. Status code: {status_code}"
+
+
+def fallback_card(word, meaning, note):
+    """The card shown when the dictionary gave none: the word's inline meaning from the deck and why."""
+    parts = [f"<p><strong>{html.escape(word)}</strong></p>"]
+    if meaning:
+        parts.append(f"<p>{html.escape(meaning)}</p>")
+    parts.append(f"<p><em>{html.escape(note)}</em></p>")
+    return "".join(parts)
+
+
+class LookupService:
+    """
+    Cache-first definition lookup.
+
+    A fresh cache entry is returned as is, an expired one is revalidated with
+    a conditional GET, and anything else is downloaded, parsed in a single
+    pass and stored. No Tk involved, so it also backs the CLI and benchmarks.
+
+    Lookups that give no card are negatively cached, and repeated failures
+    open a circuit breaker. In both cases the card falls back at once to the
+    stale cache entry or the inline meaning from the word file instead of
+    waiting on the network.
+
+    Local dictionaries (see flashcore.backends) listed before LDOCE are
+    asked first; those listed after it stand in when LDOCE has no card.
+    """
+
+    def __init__(self, cache, transport=None, breaker=None, chain=(backends.LDOCE,)):
+        self.cache = cache
+        self._transport = transport
+        self.breaker = breaker or CircuitBreaker(self.probe)
+        self.set_backends(chain)
+
+    @classmethod
+    def from_config(cls, cache, configJson, config_dir):
+        lookup = cls(cache, chain=backends.from_config(configJson, config_dir))
+        lookup.breaker = CircuitBreaker.from_config(configJson, lookup.probe)
+        return lookup
+
+    def set_backends(self, chain):
+        """Use the dictionaries in chain, in order; backends.LDOCE marks where ldoceonline.com goes."""
+        chain = list(chain)
+        self.use_ldoce = backends.LDOCE in chain
+        split = chain.index(backends.LDOCE) if self.use_ldoce else len(chain)
+        self.primary = chain[:split]
+        self.secondary = chain[split + 1:]
+
+    @property
+    def transport(self):
+        return self._transport or default_transport()
+
+    def cached(self, word):
+        """The formatted card for word if the cache has a fresh one, else None."""
+        with instrument.stage("cache", word):
+            entry = self.cache.get(word)
+        if entry:
+            instrument.count("cache.hit")
+            return entry.formatted
+        return None
+
+    def local(self, word, inline_meaning=""):
+        """
+        The card for word if it can be shown without a network request: a
+        fresh cache entry, or a fallback card when word failed recently or
+        the circuit is open. None if it has to be fetched.
+        """
+        return self._local(word, inline_meaning)[0]
+
+    def _local(self, word, inline_meaning):
+        card = self._ask(self.primary, word)
+        if card is not None:
+            return card, "local"
+        if not self.use_ldoce:
+            return fallback_card(word, inline_meaning, ldoce_parser.MEANING_NOT_FOUND), "fallback"
+        with instrument.stage("cache", word):
+            cached = self.cache.get(word)
+        if cached:
+            instrument.count("cache.hit")
+            return cached.formatted, "cache"
+        reason = self.cache.get_miss(word)
+        if reason is not None:
+            instrument.count("cache.negative")
+            self.breaker.allow()  # keeps the background probe going while only failed words are shown
+            return self._fallback(word, inline_meaning, reason), "fallback"
+        if not self.breaker.allow():
+            instrument.count("breaker.open")
+            return self._fallback(word, inline_meaning, OFFLINE_MESSAGE), "fallback"
+        return None, None
+
+    def offline(self, word):
+        """word's card from a local dictionary or the cache, expired or not; None if neither has one."""
+        card = self._ask(self.primary, word)
+        if card is None and self.use_ldoce:
+            entry = self.cache.get_stale(word)
+            card = entry.formatted if entry else None
+        if card is None:
+            card = self._ask(self.secondary, word)
+        return card
+
+    def define(self, word, inline_meaning=""):
+        """Return the card for word, fetching it if needed; inline_meaning backs it up when that fails."""
+        return self.define_with_source(word, inline_meaning)[0]
+
+    def define_with_source(self, word, inline_meaning=""):
+        """
+        (card, source) for word, where source says where the card came from:
+        "local" (a local dictionary), "cache", "revalidated", "network", or
+        "fallback" when the dictionary gave no card.
+        """
+        card, source = self._local(word, inline_meaning)
+        if card is not None:
+            return card, source
+        instrument.count("cache.miss")
+        # an expired entry is revalidated instead of downloaded again
+        stale = self.cache.get_stale(word)
+        try:
+            with instrument.stage("network", word):
+                response = self.transport.get_word_page(word, stale)
+        except OSError as e:  # requests.RequestException once the transport gave up retrying
+            return self._failed(word, inline_meaning, f"Failed to retrieve the page. Error: {e}"), "fallback"
+        if response.status_code in RETRY_STATUSES:
+            return self._failed(word, inline_meaning, failed_message(response.status_code)), "fallback"
+        self.breaker.record_success()
+        if response.status_code == 304 and stale:
+            instrument.count("cache.revalidated")
+            self.cache.revalidated(word)
+            return stale.formatted, "revalidated"
+        with instrument.stage("parse", word):
+            entry = self.extract_entry(response)
+        if entry is None:
+            if response.status_code in (200, 404):
+                self.cache.put_miss(word, ldoce_parser.MEANING_NOT_FOUND, not_found=True)
+                return self._fallback(word, inline_meaning, ldoce_parser.MEANING_NOT_FOUND), "fallback"
+            return self._failed(word, inline_meaning, failed_message(response.status_code), site_down=False), "fallback"
+        # the entry is parsed once and formatted straight from the tree
+        def_raw = str(entry)
+        try:
+            with instrument.stage("format", word):
+                formatted_def = ldoce_parser.format_entry(entry)
+        except Exception as e:
+            # a page the formatter cannot handle gets the same fallback card as any other failure
+            reason = f"Failed to format the dictionary entry. Error: {e}"
+            return self._failed(word, inline_meaning, reason, site_down=False), "fallback"
+        with instrument.stage("cache.store", word):
+            self.cache.put(word, def_raw, formatted_def,
+                           etag=response.headers.get('ETag'),
+                           last_modified=response.headers.get('Last-Modified'))
+        return formatted_def, "network"
+
+    def _failed(self, word, inline_meaning, reason, site_down=True):
+        if site_down:
+            self.breaker.record_failure()
+        self.cache.put_miss(word, reason)
+        return self._fallback(word, inline_meaning, reason)
+
+    def _fallback(self, word, inline_meaning, note):
+        # an expired card, then the dictionaries after LDOCE, beat the one-line meaning from the word file
+        stale = self.cache.get_stale(word)
+        if stale:
+            return stale.formatted
+        card = self._ask(self.secondary, word)
+        if card is not None:
+            return card
+        return fallback_card(word, inline_meaning, note)
+
+    @staticmethod
+    def _ask(dictionaries, word):
+        for dictionary in dictionaries:
+            card = dictionary.define(word)
+            if card is not None:
+                instrument.count("local.hit")
+                return card
+        return None
+
+    def probe(self):
+        """Whether the dictionary site answers again; run by the circuit breaker while it is open."""
+        response = self.transport.get(self.transport.base_url)
+        if response.status_code in RETRY_STATUSES:
+            return False
+        # words that only failed because the site was down are worth asking for again
+        self.cache.clear_failures()
+        return True
+
+    @staticmethod
+    def extract_entry(response):
+        """Return the ldoceEntry element of a dictionary page response, or None."""
+        if response.status_code != 200:
+            return None
+        return ldoce_parser.extract_entry(ldoce_parser.decode_page(response))
+
+    def close(self):
+        for dictionary in self.primary + self.secondary:
+            dictionary.close()
@@ -0,0 +1,137 @@
+"""
+On-disk review history for the scheduler.
+
+The review log is append-only; every grade adds one record (little-endian):
+
+    time      f64   unix time of the review
+    grade     u8    1 again, 2 hard, 3 good, 4 easy
+    length    u16   byte length of the word
+    word      UTF-8, the normalized word
+
+A snapshot holds the scheduling state of every reviewed card, the log
+offset it covers and the new-card count of the day it was written, in
+columns so it loads with a few array reads:
+
+    header    magic, version, card count, log offset, day, new cards that day
+    due       f64[count]   cards are stored soonest due first
+    interval  f64[count]   days
+    ease      f64[count]
+    reps      u16[count]
+    lapses    u16[count]
+    words     UTF-8, NUL separated
+
+At startup the snapshot is loaded and only the log written after it is
+replayed, so years of history cost no more to open than a day's.
+"""
+import os
+import struct
+import sys
+from array import array
+from collections import namedtuple
+
+LOG_MAGIC = b"FLREVLOG"
+SNAPSHOT_MAGIC = b"FLREVSNP"
+VERSION = 1
+_LOG_HEADER = struct.Struct("<8sH")
+_RECORD = struct.Struct("<dBH")
+_SNAPSHOT_HEADER = struct.Struct("<8sHIQIQ")
+
+
+class ReviewLog:
+    """The append-only log file; a torn record left by a crash is cut off when it is opened."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "a+b")
+        self._file.seek(0, os.SEEK_END)
+        if self._file.tell() == 0:
+            self._file.write(_LOG_HEADER.pack(LOG_MAGIC, VERSION))
+            self._file.flush()
+        else:
+            self._file.seek(0)
+            magic, version = _LOG_HEADER.unpack(self._file.read(_LOG_HEADER.size).ljust(_LOG_HEADER.size, b"\0"))
+            if magic != LOG_MAGIC or version != VERSION:
+                self._file.close()
+                raise ValueError(f"{path} is not a version {VERSION} review log")
+        self.start = _LOG_HEADER.size
+
+    @property
+    def size(self):
+        self._file.seek(0, os.SEEK_END)
+        return self._file.tell()
+
+    def append(self, when, word, grade):
+        data = word.encode("utf-8")
+        self._file.write(_RECORD.pack(when, grade, len(data)) + data)
+        self._file.flush()
+
+    def replay(self, offset=None):
+        """Yield (time, word, grade) for every record from offset (default: the first) to the end."""
+        offset = self.start if offset is None else offset
+        self._file.seek(offset)
+        data = self._file.read()
+        pos, end = 0, len(data)
+        while pos + _RECORD.size <= end:
+            when, grade, length = _RECORD.unpack_from(data, pos)
+            stop = pos + _RECORD.size + length
+            if stop > end:
+                break
+            yield when, data[pos + _RECORD.size:stop].decode("utf-8"), grade
+            pos = stop
+        if pos < end:
+            # the last record was only partly written
+            self._file.truncate(offset + pos)
+        self._file.seek(0, os.SEEK_END)
+
+    def close(self):
+        self._file.close()
+
+
+Snapshot = namedtuple("Snapshot", "words due interval ease reps lapses log_offset day new_count")
+_COLUMNS = (("due", "d"), ("interval", "d"), ("ease", "d"), ("reps", "H"), ("lapses", "H"))
+
+
+def write_snapshot(path, snapshot):
+    """Write a Snapshot atomically; its columns are arrays in the order they should be stored."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(_SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, VERSION, len(snapshot.words), snapshot.log_offset,
+                                        snapshot.day, snapshot.new_count))
+        for name, _ in _COLUMNS:
+            column = getattr(snapshot, name)
+            if sys.byteorder != "little":
+                column = array(column.typecode, column)
+                column.byteswap()
+            out.write(column.tobytes())
+        out.write("\0".join(snapshot.words).encode("utf-8"))
+        out.flush()
+        os.fsync(out.fileno())
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path):
+    """The Snapshot stored at path, or None if there is no usable one."""
+    try:
+        with open(path, "rb") as snapshot:
+            data = snapshot.read()
+        magic, version, count, log_offset, day, new_count = _SNAPSHOT_HEADER.unpack_from(data)
+    except (OSError, struct.error):
+        return None
+    if magic != SNAPSHOT_MAGIC or version != VERSION:
+        return None
+    pos = _SNAPSHOT_HEADER.size
+    columns = []
+    for _, typecode in _COLUMNS:
+        column = array(typecode)
+        size = column.itemsize * count
+        if pos + size > len(data):
+            return None
+        column.frombytes(data[pos:pos + size])
+        if sys.byteorder != "little":
+            column.byteswap()
+        columns.append(column)
+        pos += size
+    words = data[pos:].decode("utf-8").split("\0") if count else []
+    if len(words) != count:
+        return None
+    return Snapshot(words, *columns, log_offset, day, new_count)
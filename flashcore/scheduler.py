@@ -0,0 +1,225 @@
+"""
+Spaced-repetition scheduling (SM-2, with Anki-style again/hard/good/easy grades).
+
+Every graded card gets a due time. Due cards are kept in a binary heap
+ordered by due time, so finding the next card is O(log n) whatever the
+size of the deck. A review that moves a card pushes a new heap entry and
+leaves the old one behind; stale entries are recognised by their due time
+and dropped when they reach the top.
+
+Cards never graded are new: the caller introduces them in deck order, up
+to new_per_day a day. Reviews go to the append-only ReviewLog; the state
+is written to a snapshot on close(), or when opening had to replay a long
+log tail (see flashcore.reviewlog).
+"""
+import datetime
+import heapq
+import os
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+from flashcore.reviewlog import ReviewLog, Snapshot, read_snapshot, write_snapshot
+
+AGAIN, HARD, GOOD, EASY = 1, 2, 3, 4
+GRADES = {"again": AGAIN, "hard": HARD, "good": GOOD, "easy": EASY}
+
+DAY = 24 * 60 * 60
+RELEARN_SECONDS = 10 * 60   # a failed card comes back within the session
+START_EASE = 2.5
+MIN_EASE = 1.3
+NEW_PER_DAY = 20
+SNAPSHOT_AFTER = 5000       # replayed reviews that make opening write a fresh snapshot
+_COUNT_MAX = 0xFFFF
+
+CardState = namedtuple("CardState", "due interval ease reps lapses")  # interval in days
+
+
+def _day(when):
+    return datetime.date.fromtimestamp(when).toordinal()
+
+
+class Scheduler:
+    """
+    Card state lives in parallel arrays indexed by a slot number per word,
+    so half a million cards load from a snapshot without building an object
+    for each of them.
+    """
+
+    def __init__(self, log_path, snapshot_path=None, new_per_day=NEW_PER_DAY):
+        self.snapshot_path = snapshot_path or log_path + ".snapshot"
+        self.new_per_day = new_per_day
+        self._slots = {}      # normalized word -> slot
+        self._words = []      # slot -> normalized word
+        self._due = array("d")
+        self._interval = array("d")
+        self._ease = array("d")
+        self._reps = array("H")    # successful reviews in a row
+        self._lapses = array("H")
+        self._heap = []       # (due, slot); entries whose due no longer matches _due are stale
+        self._day = 0
+        self._new_today = 0
+        self._since_snapshot = 0
+        self._lock = threading.Lock()
+        self.log = ReviewLog(log_path)
+        self._load()
+
+    @classmethod
+    def from_config(cls, configJson, config_dir):
+        path = configJson.get("review_log_path") or os.path.join(config_dir, "reviews.log")
+        return cls(os.path.join(config_dir, os.path.expanduser(path)),
+                   new_per_day=configJson.get("new_cards_per_day", NEW_PER_DAY))
+
+    def _load(self):
+        offset = None
+        snapshot = read_snapshot(self.snapshot_path)
+        # a snapshot that covers more than the log has belongs to another log
+        if snapshot is not None and snapshot.log_offset <= self.log.size:
+            self._words = snapshot.words
+            self._slots = dict(zip(self._words, range(len(self._words))))
+            self._due, self._interval, self._ease = snapshot.due, snapshot.interval, snapshot.ease
+            self._reps, self._lapses = snapshot.reps, snapshot.lapses
+            offset, self._day, self._new_today = snapshot.log_offset, snapshot.day, snapshot.new_count
+        replayed = 0
+        for when, word, grade in self.log.replay(offset):
+            self._apply(word, grade, when)
+            replayed += 1
+        self._since_snapshot = replayed
+        # snapshots are stored soonest due first, and a sorted list is already a heap
+        self._heap = list(zip(self._due, range(len(self._due))))
+        if replayed:
+            heapq.heapify(self._heap)
+        if replayed >= SNAPSHOT_AFTER:
+            self.save()
+
+    def __len__(self):
+        return len(self._words)
+
+    def known(self, word):
+        """Whether word has been graded before."""
+        return word in self._slots
+
+    def state(self, word):
+        """word's CardState, or None if it was never graded."""
+        slot = self._slots.get(word)
+        if slot is None:
+            return None
+        return CardState(self._due[slot], self._interval[slot], self._ease[slot], self._reps[slot], self._lapses[slot])
+
+    def review(self, word, grade, now=None):
+        """Record a grade for word (a normalized word) and reschedule it. Returns its new due time."""
+        if grade not in GRADES.values():
+            raise ValueError(f"unknown grade {grade!r}")
+        now = time.time() if now is None else now
+        with self._lock:
+            self.log.append(now, word, grade)
+            slot = self._apply(word, grade, now)
+            due = self._due[slot]
+            heapq.heappush(self._heap, (due, slot))
+            self._since_snapshot += 1
+            # stale entries pile up while the same cards are reviewed again and again
+            if len(self._heap) > 2 * len(self._words) + 1024:
+                self._heap = list(zip(self._due, range(len(self._due))))
+                heapq.heapify(self._heap)
+        return due
+
+    def _apply(self, word, grade, now):
+        slot = self._slots.get(word)
+        if slot is None:
+            slot = self._slots[word] = len(self._words)
+            self._words.append(word)
+            self._due.append(0.0)
+            self._interval.append(0.0)
+            self._ease.append(START_EASE)
+            self._reps.append(0)
+            self._lapses.append(0)
+            day = _day(now)
+            if day != self._day:
+                self._day, self._new_today = day, 0
+            self._new_today += 1
+        reps, interval, ease = self._reps[slot], self._interval[slot], self._ease[slot]
+        if grade == AGAIN:
+            if reps:
+                self._lapses[slot] = min(_COUNT_MAX, self._lapses[slot] + 1)
+            self._reps[slot] = 0
+            self._interval[slot] = 0.0
+            self._ease[slot] = max(MIN_EASE, ease - 0.2)
+            self._due[slot] = now + RELEARN_SECONDS
+            return slot
+        if reps == 0:
+            new_interval = 1.0
+        elif reps == 1:
+            new_interval = 6.0
+        else:
+            new_interval = interval * ease
+        if grade == HARD:
+            new_interval = max(1.0, interval * 1.2 if reps else new_interval)
+            ease = max(MIN_EASE, ease - 0.15)
+        elif grade == EASY:
+            new_interval *= 1.3
+            ease += 0.15
+        self._reps[slot] = min(_COUNT_MAX, reps + 1)
+        self._interval[slot] = new_interval
+        self._ease[slot] = ease
+        self._due[slot] = now + new_interval * DAY
+        return slot
+
+    def _top(self):
+        heap, due = self._heap, self._due
+        while heap:
+            entry = heap[0]
+            if due[entry[1]] == entry[0]:
+                return entry
+            heapq.heappop(heap)
+        return None
+
+    def peek_due(self, now=None):
+        """The word due soonest if it is due by now, else None. It stays due until it is reviewed."""
+        now = time.time() if now is None else now
+        with self._lock:
+            top = self._top()
+        return self._words[top[1]] if top is not None and top[0] <= now else None
+
+    def next_due_time(self):
+        """When the next card falls due, or None if nothing has been reviewed."""
+        with self._lock:
+            top = self._top()
+        return top[0] if top is not None else None
+
+    def skip(self, word):
+        """Take word off the due queue, e.g. because it is not in the open deck; requeue() puts it back."""
+        slot = self._slots.get(word)
+        with self._lock:
+            top = self._top()
+            if top is not None and top[1] == slot:
+                heapq.heappop(self._heap)
+            else:
+                self._heap = [entry for entry in self._heap if entry[1] != slot]
+                heapq.heapify(self._heap)
+
+    def requeue(self, word):
+        slot = self._slots.get(word)
+        if slot is not None:
+            with self._lock:
+                heapq.heappush(self._heap, (self._due[slot], slot))
+
+    def new_cards_left(self, now=None):
+        day = _day(time.time() if now is None else now)
+        return self.new_per_day - (self._new_today if day == self._day else 0)
+
+    def save(self):
+        """Write a snapshot so the next start only replays the reviews after this point."""
+        with self._lock:
+            due = self._due
+            order = sorted(range(len(due)), key=due.__getitem__)
+            columns = [array(column.typecode, map(column.__getitem__, order))
+                       for column in (self._due, self._interval, self._ease, self._reps, self._lapses)]
+            write_snapshot(self.snapshot_path, Snapshot([self._words[slot] for slot in order], *columns,
+                                                        self.log.size, self._day, self._new_today))
+            self._since_snapshot = 0
+
+    def close(self):
+        if self._since_snapshot:
+            self.save()
+        self.log.close()
@@ -0,0 +1,261 @@
+"""
+Incremental search over the deck.
+
+Words are kept in a sorted array for bisect prefix lookups. Meanings are
+tokenized into posting lists with a sorted token array for prefix matching,
+and a trigram index backs typo-tolerant matching. Everything is keyed by deck
+position and updated in place when words are added or removed.
+
+Only the sorted word array is built up front. The meaning and trigram
+postings are filled in by build_step() in small chunks (the GUI runs it from
+idle callbacks), so opening a large deck never waits for them.
+"""
+import re
+from bisect import bisect_left, insort
+from collections import Counter
+
+from flashcore.cache import normalize_word
+
+_TOKEN = re.compile(r"[^\W_]+")
+_MAX_CHAR = "\U0010ffff"
+FUZZY_MIN_LENGTH = 3
+FUZZY_MAX_CANDIDATES = 2000
+MEANING_MIN_LENGTH = 2
+BUILD_CHUNK = 2000
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+def trigrams(key):
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def within_distance(a, b, limit):
+    """
+    True if the optimal string alignment distance between a and b is at
+    most limit: Levenshtein, except that swapping two adjacent letters
+    ("wrok", "thier") counts as one edit instead of two.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return False
+    before = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            if before is not None and j > 1 and ca != cb and ca == b[j - 2] and a[i - 2] == cb:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        # the row before is at most one lower, so a swap from it cannot come back under limit either
+        if min(current) > limit:
+            return False
+        before, previous = previous, current
+    return previous[-1] <= limit
+
+
+class _KeyView:
+    """Normalized words of a memory-mapped deck, by position or in a stored order, decoded on access."""
+    __slots__ = ("_words", "_order")
+
+    def __init__(self, words, order=None):
+        self._words = words
+        self._order = order
+
+    def __len__(self):
+        return len(self._words)
+
+    def __getitem__(self, i):
+        return normalize_word(self._words.word(i if self._order is None else self._order[i]))
+
+
+class DeckIndex:
+
+    def __init__(self, words=()):
+        self.rebuild(words)
+
+    @classmethod
+    def for_words(cls, words):
+        """
+        Index a deck. A memory-mapped deck gets a prefix-only index that
+        bisects the sort order stored in the file, so nothing is read up
+        front; meanings and trigrams are not indexed for it.
+        """
+        order = getattr(words, "sorted_order", None)
+        if order is None:
+            return cls(words)
+        index = cls.__new__(cls)
+        index._words = words
+        index._keys = _KeyView(words, order)
+        index._key_pos = order
+        index._pos_key = _KeyView(words)
+        index._restart_build()
+        index._built = len(words)
+        return index
+
+    def rebuild(self, words):
+        """Index a whole deck; only the prefix index is ready when this returns."""
+        self._words = words
+        keys = [normalize_word(word) for word, _ in words]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        self._keys = [keys[i] for i in order]  # sorted normalized words
+        self._key_pos = order                  # deck position for each entry of _keys
+        self._pos_key = keys                   # deck position -> normalized word
+        self._restart_build()
+
+    def _restart_build(self):
+        self._postings = {}  # meaning token -> list of deck positions
+        self._tokens = []    # sorted meaning tokens, complete once the build is done
+        self._grams = {}     # trigram -> list of deck positions
+        self._built = 0      # positions below this have meaning and trigram postings
+
+    @property
+    def ready(self):
+        return self._built >= len(self._pos_key)
+
+    def build_step(self, chunk=BUILD_CHUNK):
+        """Index the next chunk of meanings and trigrams. Returns True once everything is indexed."""
+        end = min(self._built + chunk, len(self._pos_key))
+        for pos in range(self._built, end):
+            self._index_postings(pos)
+        self._built = end
+        if self.ready:
+            self._tokens = sorted(self._postings)
+        return self.ready
+
+    def _index_postings(self, pos):
+        for token in set(tokenize(self._words[pos][1])):
+            self._postings.setdefault(token, []).append(pos)
+        for gram in trigrams(self._pos_key[pos]):
+            self._grams.setdefault(gram, []).append(pos)
+
+    def add(self, pos, word):
+        """Index the word just appended to the deck at position pos."""
+        key = normalize_word(word)
+        i = bisect_left(self._keys, key)
+        self._keys.insert(i, key)
+        self._key_pos.insert(i, pos)
+        self._pos_key.append(key)
+        if self._built == pos:
+            new_tokens = [t for t in set(tokenize(self._words[pos][1])) if t not in self._postings]
+            self._index_postings(pos)
+            self._built = pos + 1
+            if self.ready:
+                for token in new_tokens:
+                    insort(self._tokens, token)
+
+    def remove(self, pos):
+        """Drop deck position pos (already removed from the deck) and shift later positions down."""
+        key = self._pos_key.pop(pos)
+        i = bisect_left(self._keys, key)
+        while self._key_pos[i] != pos:
+            i += 1
+        del self._keys[i]
+        del self._key_pos[i]
+        # removal already costs a file rewrite, so O(n) renumbering is acceptable here
+        self._key_pos = [p - 1 if p > pos else p for p in self._key_pos]
+        if not self.ready:
+            self._restart_build()
+            return
+        for index in (self._postings, self._grams):
+            for name in list(index):
+                positions = [p - 1 if p > pos else p for p in index[name] if p != pos]
+                if positions:
+                    index[name] = positions
+                else:
+                    del index[name]
+        self._tokens = sorted(self._postings)
+
+    def prefix(self, query):
+        """Positions of words starting with query, in alphabetical order."""
+        query = normalize_word(query)
+        lo = bisect_left(self._keys, query)
+        hi = bisect_left(self._keys, query + _MAX_CHAR, lo)
+        return self._key_pos[lo:hi]
+
+    def positions_of(self, key):
+        """Deck positions of an exact normalized word."""
+        lo = bisect_left(self._keys, key)
+        hi = bisect_left(self._keys, key + "\0", lo)
+        return self._key_pos[lo:hi]
+
+    def meaning(self, query, limit):
+        """Up to limit positions whose inline meaning has every query token (the last as a prefix)."""
+        tokens = tokenize(query)
+        if not tokens or len(query.strip()) < MEANING_MIN_LENGTH:
+            return []
+        required = None
+        for token in tokens[:-1]:
+            positions = set(self._postings.get(token, ()))
+            required = positions if required is None else required & positions
+            if not required:
+                return []
+        last = tokens[-1]
+        lo = bisect_left(self._tokens, last)
+        hi = bisect_left(self._tokens, last + _MAX_CHAR, lo)
+        found = set()
+        for name in self._tokens[lo:hi]:
+            for pos in self._postings[name]:
+                if required is None or pos in required:
+                    found.add(pos)
+            if len(found) >= limit:
+                break
+        return sorted(found)[:limit]
+
+    def fuzzy(self, query):
+        """Positions of words within one or two edits of query, or whose start is."""
+        key = normalize_word(query)
+        if len(key) < FUZZY_MIN_LENGTH:
+            return []
+        max_distance = 1 if len(key) < 8 else 2
+        grams = trigrams(key)
+        counts = Counter()
+        for gram in grams:
+            counts.update(self._grams.get(gram, ()))
+        # each edit touches at most four trigrams (a swap of two letters); the
+        # end-of-word gram is not shared by longer words that merely start with the query
+        needed = max(1, len(grams) - 4 * max_distance - 1)
+        matches = []
+        for pos, shared in counts.most_common(FUZZY_MAX_CANDIDATES):
+            if shared < needed:
+                break
+            word = self._pos_key[pos]
+            if within_distance(key, word, max_distance) or within_distance(key, word[:len(key)], max_distance):
+                matches.append(pos)
+        matches.sort(key=self._pos_key.__getitem__)
+        return matches
+
+    def search(self, query, limit=1000, definition_words=()):
+        """
+        Ranked deck positions for query: word prefix matches first, then
+        inline-meaning matches, then words whose cached definition matched
+        (definition_words, as normalized words), then near misses when
+        nothing else came close.
+        """
+        if not query.strip():
+            return []
+        results = []
+        seen = set()
+
+        def extend(positions):
+            for pos in positions:
+                if pos not in seen:
+                    seen.add(pos)
+                    results.append(pos)
+                    if len(results) >= limit:
+                        return True
+            return False
+
+        if extend(self.prefix(query)):
+            return results
+        if extend(self.meaning(query, limit)):
+            return results
+        for key in definition_words:
+            if extend(self.positions_of(key)):
+                return results
+        if len(results) < 10:
+            extend(self.fuzzy(query))
+        return results
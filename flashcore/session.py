@@ -0,0 +1,73 @@
+import random
+
+
+class StudySession:
+    """
+    Navigation state over a deck: which card is shown, which side is up, and
+    the pre-drawn next random card (drawn early so it can be prefetched).
+    """
+
+    def __init__(self, deck=()):
+        self.deck = deck
+        self.current_index = 0
+        self.is_flipped = False
+        self.current_word = ''
+        self.definition_html = ""  # the back of the current card once it is known
+        self.next_random = None
+
+    def set_deck(self, deck):
+        self.deck = deck
+        self.current_index = min(self.current_index, max(len(deck) - 1, 0))
+        self.next_random = None
+
+    def draw_random(self):
+        return random.randrange(len(self.deck)) if len(self.deck) else None
+
+    def show(self, word, flipped):
+        """Make word the current card. Returns word."""
+        self.current_word = word
+        self.is_flipped = flipped
+        self.definition_html = ""
+        return word
+
+    def goto(self, index, flipped=False):
+        self.current_index = index
+        return self.show(self.deck[index][0], flipped)
+
+    def next(self):
+        """Move to the next card; returns its word, or None at the end of the deck."""
+        if self.current_index >= len(self.deck) - 1:
+            return None
+        return self.goto(self.current_index + 1)
+
+    def previous(self):
+        """Move to the previous card; returns its word, or None at the start of the deck."""
+        if self.current_index <= 0:
+            return None
+        return self.goto(self.current_index - 1)
+
+    def random(self):
+        """Move to the pre-drawn random card and draw the one after it."""
+        if self.next_random is None or self.next_random >= len(self.deck):
+            self.next_random = self.draw_random()
+        if self.next_random is None:
+            return None
+        index = self.next_random
+        self.next_random = self.draw_random()
+        return self.goto(index)
+
+    def removed(self, index):
+        """Keep the position valid after the deck entry at index was removed."""
+        self.current_index = min(index, max(len(self.deck) - 1, 0))
+        self.next_random = None
+
+    def prefetch_window(self, ahead, behind):
+        """Words the user is likely to open next: neighbours and the next random card."""
+        index = self.current_index
+        indexes = list(range(index + 1, min(index + 1 + ahead, len(self.deck))))
+        indexes += range(max(index - behind, 0), index)
+        if self.next_random is None:
+            self.next_random = self.draw_random()
+        if self.next_random is not None and self.next_random < len(self.deck):
+            indexes.append(self.next_random)
+        return [self.deck[i][0] for i in indexes]
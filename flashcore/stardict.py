@@ -0,0 +1,305 @@
+"""
+Reader for StarDict dictionaries (.ifo / .idx / .dict or .dict.dz).
+
+The .idx file is memory-mapped. It holds one entry per headword, sorted
+case-insensitively (ASCII only, like g_ascii_strcasecmp):
+
+    headword  UTF-8, NUL terminated
+    offset    big-endian u32 (u64 when the .ifo says idxoffsetbits=64)
+    size      big-endian u32
+
+Entries have different lengths, so the start of every entry is collected in
+one pass over the file on a background thread when the dictionary is opened;
+after that a lookup is a binary search over the mapped file. The articles
+are read from .dict (also mapped) or from a dictzip-compressed .dict.dz,
+which is gzip with a table of independently inflatable chunks.
+
+Articles are turned into the same card layout ldoce_parser.format_entry
+produces: a header paragraph with the headword, pronunciation and part of
+speech, then one paragraph per sense.
+"""
+import gzip
+import html
+import mmap
+import os
+import re
+import struct
+import threading
+import zlib
+from array import array
+
+_TAG = re.compile(r"<[^>]+>")
+_BREAK = re.compile(r"<br\s*/?>|</p>|</div>|</li>|</def>", re.I)
+_XDXF_FIELD = re.compile(r"<(tr|abr|pos)>(.*?)</\1>", re.S)
+_NUMBERED = re.compile(r"^\s*(\d+)[.)]\s*")
+_TEXT_TYPES = "mlgtxykwh"  # lowercase field types with readable text
+_POS_LABELS = {"noun", "verb", "adjective", "adverb", "pronoun", "preposition", "conjunction", "interjection",
+               "determiner", "phrasal verb", "n", "v", "adj", "adv", "prep", "conj", "pron", "int", "vt", "vi"}
+
+
+def read_ifo(path):
+    """The key=value settings of a .ifo file."""
+    with open(path, encoding="utf-8") as ifo:
+        if ifo.readline().strip() != "StarDict's dict ifo file":
+            raise ValueError(f"{path} is not a StarDict .ifo file")
+        settings = {}
+        for line in ifo:
+            key, sep, value = line.strip().partition("=")
+            if sep:
+                settings[key] = value
+    return settings
+
+
+def _sibling(base, *suffixes):
+    for suffix in suffixes:
+        if os.path.exists(base + suffix):
+            return base + suffix
+    raise FileNotFoundError(f"no {' or '.join(base + s for s in suffixes)}")
+
+
+class _DictZip:
+    """Random access into a dictzip file: only the chunks an article spans are inflated."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        header = self._file.read(10)
+        if header[:3] != b"\x1f\x8b\x08" or not header[3] & 0x04:
+            self._file.close()
+            raise ValueError(f"{path} is not a dictzip file")
+        flags = header[3]
+        extra_len, = struct.unpack("<H", self._file.read(2))
+        extra = self._file.read(extra_len)
+        self._chunk_len = self._chunks = None
+        pos = 0
+        while pos + 4 <= len(extra):
+            sub_id, sub_len = extra[pos:pos + 2], struct.unpack_from("<H", extra, pos + 2)[0]
+            if sub_id == b"RA":
+                _version, self._chunk_len, count = struct.unpack_from("<HHH", extra, pos + 4)
+                self._chunks = struct.unpack_from(f"<{count}H", extra, pos + 10)
+            pos += 4 + sub_len
+        if self._chunks is None:
+            self._file.close()
+            raise ValueError(f"{path} has no dictzip chunk table")
+        for flag in (0x08, 0x10):  # file name, comment
+            if flags & flag:
+                while self._file.read(1) not in (b"\0", b""):
+                    pass
+        if flags & 0x02:  # header crc
+            self._file.read(2)
+        start = self._file.tell()
+        self._starts = [start]
+        for size in self._chunks:
+            self._starts.append(self._starts[-1] + size)
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def _chunk(self, i):
+        data = self._cache.get(i)
+        if data is None:
+            self._file.seek(self._starts[i])
+            data = zlib.decompressobj(-zlib.MAX_WBITS).decompress(self._file.read(self._chunks[i]))
+            if len(self._cache) >= 8:
+                self._cache.clear()
+            self._cache[i] = data
+        return data
+
+    def read(self, offset, size):
+        first, last = offset // self._chunk_len, (offset + size - 1) // self._chunk_len
+        with self._lock:
+            data = b"".join(self._chunk(i) for i in range(first, last + 1))
+        start = offset - first * self._chunk_len
+        return data[start:start + size]
+
+    def close(self):
+        self._file.close()
+
+
+class _MappedFile:
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, offset, size):
+        return self._map[offset:offset + size]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class StarDict:
+    """A StarDict dictionary opened from its .ifo path; lookup(word) returns its articles."""
+
+    def __init__(self, ifo_path):
+        self.path = ifo_path
+        self.info = read_ifo(ifo_path)
+        self.name = self.info.get("bookname", os.path.basename(ifo_path))
+        self.types = self.info.get("sametypesequence", "")
+        self._entry_tail = struct.Struct(">QI" if self.info.get("idxoffsetbits") == "64" else ">II")
+        base = ifo_path[:-len(".ifo")] if ifo_path.endswith(".ifo") else ifo_path
+        idx_path = _sibling(base, ".idx", ".idx.gz")
+        dict_path = _sibling(base, ".dict", ".dict.dz")
+        if idx_path.endswith(".gz"):
+            with gzip.open(idx_path) as idx:
+                self._idx = idx.read()
+            self._idx_file = None
+        else:
+            self._idx_file = open(idx_path, "rb")
+            self._idx = mmap.mmap(self._idx_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._dict = _DictZip(dict_path) if dict_path.endswith(".dz") else _MappedFile(dict_path)
+        self._starts = None
+        self._ready = threading.Event()
+        threading.Thread(target=self._index_entries, name="stardict-index", daemon=True).start()
+
+    def _index_entries(self):
+        idx, find, tail = self._idx, self._idx.find, self._entry_tail.size + 1
+        starts = array("L" if len(idx) < 1 << 32 else "Q")
+        pos, end = 0, len(idx)
+        while pos < end:
+            starts.append(pos)
+            pos = find(b"\0", pos) + tail
+            if pos < tail:  # truncated file
+                starts.pop()
+                break
+        self._starts = starts
+        self._ready.set()
+
+    def __len__(self):
+        self._ready.wait()
+        return len(self._starts)
+
+    def _headword(self, i):
+        start = self._starts[i]
+        return self._idx[start:self._idx.find(b"\0", start)]
+
+    def _locate(self, i):
+        start = self._starts[i]
+        end = self._idx.find(b"\0", start)
+        return self._entry_tail.unpack_from(self._idx, end + 1)
+
+    def lookup(self, word):
+        """Articles for word as lists of (type, text) fields; exact-case matches come first."""
+        self._ready.wait()
+        wanted = " ".join(word.split()).encode("utf-8")
+        key = wanted.lower()
+        lo, hi = 0, len(self._starts)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._headword(mid).lower() < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        matches = []
+        while lo < len(self._starts):
+            headword = self._headword(lo)
+            if headword.lower() != key:
+                break
+            matches.append((headword != wanted, lo))
+            lo += 1
+        return [self._article(i) for _, i in sorted(matches)]
+
+    def _article(self, i):
+        offset, size = self._locate(i)
+        return self._fields(self._dict.read(offset, size))
+
+    def _fields(self, data):
+        fields = []
+        if self.types:
+            # every article has these fields in this order; the last one runs to the end
+            pos = 0
+            for n, kind in enumerate(self.types):
+                text, pos = _field(data, pos, kind, last=n == len(self.types) - 1)
+                if text is not None:
+                    fields.append((kind, text))
+            return fields
+        pos = 0
+        while pos < len(data):
+            kind = chr(data[pos])
+            text, pos = _field(data, pos + 1, kind, last=False)
+            if text is not None:
+                fields.append((kind, text))
+        return fields
+
+    def close(self):
+        self._ready.wait()
+        if self._idx_file is not None:
+            self._idx.close()
+            self._idx_file.close()
+        self._dict.close()
+
+
+def _field(data, pos, kind, last):
+    """(text or None, position after the field) for the field of type kind at pos."""
+    if kind.isupper():
+        # resource, image or sound data: nothing to show on a card
+        if last:
+            return None, len(data)
+        size, = struct.unpack_from(">I", data, pos)
+        return None, pos + 4 + size
+    end = len(data) if last else data.find(b"\0", pos)
+    if end < 0:
+        end = len(data)
+    return data[pos:end].decode("utf-8", "replace"), end + 1
+
+
+def _lines(kind, text):
+    if kind in "hgx":
+        text = _TAG.sub("", _BREAK.sub("\n", text))
+        text = html.unescape(text)
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def _is_pos_label(line):
+    return line.lower().rstrip(".") in _POS_LABELS
+
+
+def format_articles(word, articles, source):
+    """Build a card in the format_entry layout from StarDict articles; None if there is nothing to show."""
+    pron = pos = ""
+    senses = []
+    for article in articles:
+        for kind, text in article:
+            if kind not in _TEXT_TYPES:
+                continue
+            if kind == "t":
+                pron = pron or text.strip()
+                continue
+            if kind == "x":
+                for tag, value in _XDXF_FIELD.findall(text):
+                    value = html.unescape(_TAG.sub("", value)).strip()
+                    if tag == "tr":
+                        pron = pron or value
+                    else:
+                        pos = pos or value
+                text = _XDXF_FIELD.sub("", re.sub(r"<k>.*?</k>", "", text, flags=re.S))
+            senses.extend(_lines(kind, text))
+    # a leading line that only repeats the headword adds nothing
+    while senses and senses[0].lower() == word.lower():
+        senses.pop(0)
+    if senses and not pos and _is_pos_label(senses[0]):
+        pos = senses.pop(0)
+    if not senses:
+        return None
+    header = (f'<p>{html.escape(source)}<br />'
+              f'<span style="color: #ff0000;"><strong>{html.escape(word)}</strong></span> ')
+    if pron:
+        header += f'<span style="color: #ff6600;">/ {html.escape(pron)} /</span> '
+    if pos:
+        header += f'<span style="color: #339966;"><strong> {html.escape(pos)}</strong></span>'
+    parts = [header.rstrip() + "</p>"]
+    number = 0
+    for sense in senses:
+        if _is_pos_label(sense):
+            # the senses of another part of speech follow
+            parts.append(f'<p><span style="color: #339966;"><strong> {html.escape(sense)}</strong></span></p>')
+            number = 0
+            continue
+        match = _NUMBERED.match(sense)
+        if match:
+            number = int(match.group(1))
+            sense = sense[match.end():]
+        else:
+            number += 1
+        parts.append(f"<p>{number}. {html.escape(sense)}<br /></p>")
+    return "".join(parts)
@@ -0,0 +1,64 @@
+"""
+Startup tracing for `flashcard.py --trace-startup`.
+
+Phases are timed against the moment flashcard.py started executing and
+printed as one report once the window is interactive and the deck has
+finished loading. When tracing is off every call is a no-op.
+"""
+import sys
+import time
+
+STARTUP_BUDGET_MS = 500
+
+
+class StartupTrace:
+
+    def __init__(self, enabled=False, start=None, budget_ms=STARTUP_BUDGET_MS):
+        self.enabled = enabled
+        self.start = start if start is not None else time.perf_counter()
+        self.budget_ms = budget_ms
+        self.phases = []  # (name, start, end) in seconds since self.start
+        self.marks = {}   # name -> seconds since self.start
+        self._open = {}
+        self.reported = False
+
+    def now(self):
+        return time.perf_counter() - self.start
+
+    def begin(self, name):
+        if self.enabled:
+            self._open[name] = self.now()
+
+    def end(self, name):
+        if self.enabled and name in self._open:
+            self.phases.append((name, self._open.pop(name), self.now()))
+
+    def phase(self, name, start, end=None):
+        """Record a phase between two time.perf_counter() values; end defaults to now."""
+        if self.enabled:
+            end = self.now() if end is None else end - self.start
+            self.phases.append((name, start - self.start, end))
+
+    def mark(self, name):
+        """Record the first time name happened."""
+        if self.enabled and name not in self.marks:
+            self.marks[name] = self.now()
+
+    def report(self, file=None, **counts):
+        """Print the phase breakdown once."""
+        if not self.enabled or self.reported:
+            return
+        self.reported = True
+        file = file or sys.stderr
+        print("startup trace (ms since flashcard.py started):", file=file)
+        for name, start, end in sorted(self.phases, key=lambda phase: phase[1]):
+            print(f"  {name:<22}{(end - start) * 1000:9.1f} ms   [{start * 1000:7.1f} -> {end * 1000:7.1f}]", file=file)
+        for name, at in sorted(self.marks.items(), key=lambda mark: mark[1]):
+            print(f"  {name:<22}{at * 1000:9.1f} ms", file=file)
+        for name, value in counts.items():
+            print(f"  {name:<22}{value:>9}", file=file)
+        interactive = self.marks.get("interactive")
+        if interactive is not None:
+            verdict = "within" if interactive * 1000 <= self.budget_ms else "OVER"
+            print(f"  time to first interaction {interactive * 1000:.1f} ms, {verdict} the "
+                  f"{self.budget_ms} ms budget", file=file)
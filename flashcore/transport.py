@@ -0,0 +1,124 @@
+import random
+import threading
+import time
+from urllib.parse import quote
+
+LDOCE_URL = "https://www.ldoceonline.com/dictionary/"
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class LdoceTransport:
+    """
+    Shared HTTP access to ldoceonline.com.
+
+    One pooled requests.Session keeps connections alive between lookups.
+    Every request has connect/read timeouts, and connection errors or
+    retryable statuses are retried a bounded number of times with jittered
+    exponential backoff. Passing a cached entry's ETag / Last-Modified turns
+    the request into a conditional GET that may come back as 304.
+    """
+
+    def __init__(self, base_url=LDOCE_URL, connect_timeout=5, read_timeout=15, retries=2,
+                 backoff=0.5, max_backoff=8, pool_size=8):
+        self.base_url = base_url
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        # requests is imported on first use; it is a noticeable part of app startup
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    @classmethod
+    def from_config(cls, configJson):
+        return cls(
+            base_url=configJson.get("ldoce_url", LDOCE_URL),
+            connect_timeout=configJson.get("http_connect_timeout", 5),
+            read_timeout=configJson.get("http_read_timeout", 15),
+            retries=configJson.get("http_retries", 2),
+        )
+
+    def word_url(self, word):
+        return self.base_url + quote(word.strip())
+
+    def get(self, url, etag=None, last_modified=None):
+        """GET url, retrying transient failures. Raises requests.RequestException once retries run out."""
+        import requests
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        attempt = 0
+        while True:
+            try:
+                response = self.session.get(url, headers=headers, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.retries:
+                    raise
+            else:
+                if response.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return response
+            time.sleep(self._backoff_delay(attempt))
+            attempt += 1
+
+    def get_word_page(self, word, cached=None):
+        """Fetch the dictionary page for word, revalidating the cached entry if one is given."""
+        if cached is None:
+            return self.get(self.word_url(word))
+        return self.get(self.word_url(word), etag=cached.etag, last_modified=cached.last_modified)
+
+    def _backoff_delay(self, attempt):
+        # "full jitter": spreads retries from many clients instead of syncing them up
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** attempt)))
+
+    def close(self):
+        self.session.close()
+
+
+_default = None
+_default_config = {}
+_default_lock = threading.Lock()
+
+
+def default_transport():
+    """Return the process-wide transport, creating it on first use."""
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = LdoceTransport.from_config(_default_config)
+        return _default
+
+
+def set_default_transport(transport):
+    global _default
+    with _default_lock:
+        _default = transport
+
+
+def configure_default_transport(configJson):
+    """Create the process-wide transport from configJson's settings when it is first used."""
+    global _default, _default_config
+    with _default_lock:
+        previous, _default, _default_config = _default, None, configJson
+    if previous is not None:
+        previous.close()
+
+
+def close_default_transport():
+    """Close the process-wide transport if one was created."""
+    global _default
+    with _default_lock:
+        previous, _default = _default, None
+    if previous is not None:
+        previous.close()
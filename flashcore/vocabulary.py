@@ -0,0 +1,288 @@
+"""
+Vocabulary extraction from large text or HTML documents.
+
+The document is read in chunks of a few MB, each cut at a word (or, for
+HTML, a tag) boundary, and the words of every chunk are counted on their
+own: in a process pool when the document is large, since the regex work is
+CPU-bound, otherwise inline. Only the counts are kept, so memory grows
+with the document's vocabulary and not with its size.
+
+The counts are then folded: case is dropped (a word seen only capitalized
+is taken for a name and skipped), inflected forms are reduced to a base
+form, and stop words, short words, words already in the deck and words
+seen fewer than min_count times (typos, stray tokens) are dropped. What is
+left is ranked rarest first.
+
+There is no word list to lemmatize against, so the document serves as its
+own lexicon (see lemmas()): irregular forms are looked up, and a suffix is
+only stripped when the base occurs in the document or the deck, or when
+several forms in the document reduce to it ("studies" and "studied" to
+"study" even if "study" itself never appears).
+"""
+import html
+import os
+import re
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+CHUNK_CHARS = 1 << 22          # characters read per chunk
+PARALLEL_BYTES = 16 << 20      # documents at least this big are tokenized in a process pool
+HTML_EXTENSIONS = (".html", ".htm", ".xhtml")
+
+_WORD = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+_SKIPPED_ELEMENTS = re.compile(r"<(script|style)\b.*?</\1\s*>", re.I | re.S)
+_TAG = re.compile(r"<[^>]*>")
+_OPEN_SKIPPED = re.compile(r"<(?:script|style)\b", re.I)
+_CLOSE_SKIPPED = re.compile(r"</(?:script|style)\s*>", re.I)
+
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each even ever every few for from further
+had has have having he her here hers herself him himself his how however i if in into is it its itself
+just least less let like many may me might more most much must my myself neither never no nor not now
+of off often on once one only or other others our ours ourselves out over own per perhaps quite rather
+really said same say says shall she should since so some such than that the their theirs them
+themselves then there these they this those though through thus to too two under until up upon us very
+was we were what when where whether which while who whom whose why will with within without would yes
+yet you your yours yourself yourselves
+""".split())
+
+# common irregular forms; regular ones are handled by _SUFFIXES
+IRREGULAR = {
+    "began": "begin", "begun": "begin", "broke": "break", "broken": "break", "brought": "bring",
+    "bought": "buy", "caught": "catch", "chose": "choose", "chosen": "choose", "drew": "draw",
+    "drawn": "draw", "drove": "drive", "driven": "drive", "ate": "eat", "eaten": "eat", "fell": "fall",
+    "fallen": "fall", "felt": "feel", "fought": "fight", "found": "find", "flew": "fly", "flown": "fly",
+    "forgot": "forget", "forgotten": "forget", "froze": "freeze", "frozen": "freeze", "gave": "give",
+    "given": "give", "grew": "grow", "grown": "grow", "hid": "hide", "hidden": "hide", "held": "hold",
+    "kept": "keep", "knew": "know", "known": "know", "lost": "lose", "meant": "mean", "met": "meet",
+    "paid": "pay", "ran": "run", "sat": "sit", "saw": "see", "seen": "see", "sold": "sell", "sent": "send",
+    "shook": "shake", "shaken": "shake", "sang": "sing", "sung": "sing", "sought": "seek", "spoke": "speak",
+    "spoken": "speak", "spent": "spend", "stole": "steal", "stolen": "steal", "stood": "stand",
+    "struck": "strike", "swam": "swim", "taught": "teach", "thought": "think", "threw": "throw",
+    "thrown": "throw", "told": "tell", "took": "take", "taken": "take", "tore": "tear", "torn": "tear",
+    "understood": "understand", "woke": "wake", "wore": "wear", "worn": "wear", "won": "win",
+    "wrote": "write", "written": "write", "children": "child", "men": "man", "women": "woman",
+    "feet": "foot", "teeth": "tooth", "mice": "mouse", "geese": "goose",
+}
+
+# words that look inflected but are not
+STEM_EXCEPTIONS = frozenset("""
+news series species means glasses physics mathematics economics politics athletics always lens chaos
+evening morning
+""".split())
+
+# (suffix, endings that may replace it), tried in order
+_SUFFIXES = (
+    ("ies", ("y",)), ("ied", ("y",)), ("ier", ("y",)), ("iest", ("y",)),
+    ("s", ("",)), ("es", ("",)),
+    ("ing", ("", "e")), ("ed", ("", "e")),
+)
+_KEEP_DOUBLE = "lszf"   # fill, pass, buzz, stuff keep their doubled letter
+# stems that more likely lost a silent e: hoping, naming, decided, produced, created (not visited, opened)
+_TAKES_E = re.compile(r"(?:[cvzu]|[^aeiou](?:at|id|ir|ur|ot|ut)|^[^aeiou]*[aeiou][^aeiouwxy])$")
+
+
+def is_html(path):
+    """Whether path looks like an HTML document, by extension or by its first bytes."""
+    if path.lower().endswith(HTML_EXTENSIONS):
+        return True
+    with open(path, "rb") as document:
+        head = document.read(1024).lstrip().lower()
+    return head.startswith((b"<!doctype html", b"<html"))
+
+
+def _cut(text, markup):
+    """Where to end a chunk so that no word, tag or script element is split; the rest is carried over."""
+    if markup:
+        cut = text.rfind("<")
+        opened = None
+        for opened in _OPEN_SKIPPED.finditer(text):
+            pass
+        if opened is not None and not _CLOSE_SKIPPED.search(text, opened.end()):
+            cut = opened.start() if cut < 0 else min(cut, opened.start())
+    else:
+        cut = max(text.rfind(" "), text.rfind("\n"), text.rfind("\t"))
+    # a chunk with no place to cut (one giant token or script) is taken whole
+    return cut if cut > 0 else len(text)
+
+
+def read_chunks(path, markup=False, chunk_chars=CHUNK_CHARS):
+    """Yield the document at path in pieces of about chunk_chars that can be tokenized independently."""
+    with open(path, encoding="utf-8", errors="replace") as document:
+        carry = ""
+        while True:
+            block = document.read(chunk_chars)
+            if not block:
+                break
+            text = carry + block
+            cut = _cut(text, markup)
+            carry = text[cut:]
+            yield text[:cut]
+        if carry:
+            yield carry
+
+
+def count_tokens(text, markup=False):
+    """Count the words of one chunk, with their case."""
+    if markup:
+        text = html.unescape(_TAG.sub(" ", _SKIPPED_ELEMENTS.sub(" ", text)))
+    counts = Counter()
+    find = _WORD.findall
+    # splitting on whitespace is much cheaper than the word pattern, which then only sees distinct tokens
+    for token, n in Counter(text.split()).items():
+        for word in find(token):
+            counts[word] += n
+    return counts
+
+
+def _stems(word):
+    """Possible base forms of word, likeliest first."""
+    for suffix, endings in _SUFFIXES:
+        if not word.endswith(suffix) or len(word) - len(suffix) < 2:
+            continue
+        if suffix == "s" and word.endswith(("ss", "us", "is", "sses", "xes", "zzes", "shes")):
+            continue  # class, bonus, basis; passes, boxes, wishes take "es"
+        stem = word[:-len(suffix)]
+        if "" in endings and len(stem) > 2 and stem[-1] == stem[-2] and stem[-1] not in "aeiou" + _KEEP_DOUBLE:
+            yield stem[:-1]  # running -> run, stopped -> stop
+            yield stem       # added -> add
+        elif "e" in endings and _TAKES_E.search(stem):
+            yield stem + "e"
+            yield stem
+        else:
+            for ending in endings:
+                yield stem + ending
+
+
+def lemmas(words, known=(), stop_words=STOP_WORDS):
+    """
+    Map each lowercase word of a document to its base form. An irregular
+    form maps to its base. Otherwise the first possible base that is a word
+    of the document, an irregular base or a known word wins; failing that,
+    the base most other words of the document also reduce to, as long as
+    at least two do. A word with neither keeps its own form.
+    """
+    bases = {}
+    candidates = {}
+    for word in words:
+        base = IRREGULAR.get(word)
+        if base is not None:
+            bases[word] = base
+        elif word not in STEM_EXCEPTIONS:
+            stems = [stem for stem in dict.fromkeys(_stems(word)) if stem not in stop_words]
+            if stems:
+                candidates[word] = stems
+    lexicon = set(words)
+    lexicon.update(bases.values())
+    lexicon.update(known)
+    # how many different words each base would account for
+    support = Counter(stem for stems in candidates.values() for stem in stems)
+    for word in words:
+        if word in bases:
+            continue
+        stems = candidates.get(word, ())
+        base = next((stem for stem in stems if stem in lexicon), None)
+        if base is None:
+            shared = [stem for stem in stems if len(stem) >= 3 and support[stem] > 1]
+            base = max(shared, key=support.__getitem__) if shared else word
+        bases[word] = base
+    return bases
+
+
+class ExtractStats:
+    def __init__(self, total_bytes=0):
+        self.total_bytes = total_bytes
+        self.read_chars = 0
+        self.tokens = 0
+        self.started = time.monotonic()
+        self.finished = None
+
+    def report(self):
+        elapsed = (self.finished or time.monotonic()) - self.started
+        mb = self.read_chars / (1 << 20)
+        total = f"/{self.total_bytes / (1 << 20):.0f}" if self.total_bytes else ""
+        rate = mb / elapsed if elapsed else 0.0
+        return f"{mb:.0f}{total} MB  {rate:.1f} MB/s  {self.tokens} words"
+
+
+class VocabularyExtractor:
+    """
+    Finds words worth learning in a document. known holds the deck's words
+    (normalized); they and their inflected forms are never suggested.
+    """
+
+    def __init__(self, known=(), stop_words=STOP_WORDS, min_count=2, min_length=3, workers=None,
+                 progress=None):
+        self.known = set(known)
+        self.stop_words = stop_words
+        self.min_count = min_count
+        self.min_length = min_length
+        self.workers = workers or os.cpu_count() or 1
+        self.progress = progress
+        self.stats = ExtractStats()
+
+    def count(self, path, markup=None):
+        """Counts of the words of the document at path, with their case (see count_tokens)."""
+        markup = is_html(path) if markup is None else markup
+        self.stats = stats = ExtractStats(os.path.getsize(path))
+        counts = Counter()
+        if self.workers > 1 and stats.total_bytes >= PARALLEL_BYTES:
+            with ProcessPoolExecutor(self.workers) as pool:
+                # a bounded window of chunks in flight keeps memory flat while the pool stays busy
+                window = deque()
+                for chunk in read_chunks(path, markup):
+                    window.append(pool.submit(count_tokens, chunk, markup))
+                    self._read(len(chunk))
+                    if len(window) >= self.workers * 2:
+                        self._merge(counts, window.popleft().result())
+                while window:
+                    self._merge(counts, window.popleft().result())
+        else:
+            for chunk in read_chunks(path, markup):
+                self._read(len(chunk))
+                self._merge(counts, count_tokens(chunk, markup))
+        stats.finished = time.monotonic()
+        return counts
+
+    def _read(self, chars):
+        self.stats.read_chars += chars
+        if self.progress is not None:
+            self.progress(self.stats.report())
+
+    def _merge(self, counts, chunk_counts):
+        counts.update(chunk_counts)
+        self.stats.tokens += sum(chunk_counts.values())
+
+    def fold(self, counts):
+        """Lowercase base form -> count, without names, stop words, short words or words in the deck."""
+        lowercase = Counter()
+        seen_lowercase = set()
+        for token, n in counts.items():
+            word = token.replace("’", "'")
+            if word.endswith("'s"):
+                word = word[:-2]
+            if "'" in word:
+                continue  # contractions
+            lower = word.lower()
+            lowercase[lower] += n
+            if word == lower:
+                seen_lowercase.add(lower)
+        words = [word for word in lowercase if word in seen_lowercase]
+        bases = lemmas(words, self.known, self.stop_words)
+        folded = Counter()
+        for word in words:
+            base = bases[word]
+            if len(base) < self.min_length or base in self.stop_words or base in self.known:
+                continue
+            folded[base] += lowercase[word]
+        return folded
+
+    def extract(self, path, limit=100, markup=None):
+        """Up to limit (word, count) pairs from the document at path, rarest first."""
+        folded = self.fold(self.count(path, markup))
+        candidates = [(word, n) for word, n in folded.items() if n >= self.min_count]
+        # among equally rare words, longer ones are more often the unfamiliar ones
+        candidates.sort(key=lambda item: (item[1], -len(item[0]), item[0]))
+        return candidates[:limit] if limit else candidates
@@ -0,0 +1,27 @@
+from flashcore.search import DeckIndex, within_distance
+
+DECK = [("work", ""), ("case", ""), ("receive", ""), ("their", ""), ("rigorous", "strict")]
+
+
+def _fuzzy_words(query):
+    index = DeckIndex(DECK)
+    while not index.build_step():
+        pass
+    return [DECK[pos][0] for pos in index.fuzzy(query)]
+
+
+def test_swapped_letters_count_as_one_edit():
+    assert within_distance("wrok", "work", 1)
+    assert within_distance("thier", "their", 1)
+    assert not within_distance("wrok", "work", 0)
+    assert not within_distance("owrk", "wokr", 1)
+
+
+def test_fuzzy_finds_transposition_typos():
+    for query, word in [("wrok", "work"), ("wokr", "work"), ("caes", "case"), ("recieve", "receive"),
+                        ("thier", "their"), ("rigoruos", "rigorous")]:
+        assert word in _fuzzy_words(query), query
+
+
+def test_fuzzy_still_rejects_distant_words():
+    assert _fuzzy_words("wxyz") == []